@@ -1,34 +1,92 @@
 from discord.ext import commands
+import asyncio
+import os
+from utils.triggers import Trigger_Engine, load_triggers
+from utils.rate_limit import SEND_BUDGET, LOW, Response_Limiter
+from utils.scheduler import SCHEDULER
+
+TRIGGERS_FILE = "data/triggers.json"
+# Replies in the same channel within this many seconds go out as one message.
+REPLY_BATCH_WINDOW = float(os.getenv("REPLY_BATCH_WINDOW", 1))
+# Replies held back for tracker and grinder traffic give up after this many seconds.
+REPLY_MAX_WAIT = float(os.getenv("REPLY_MAX_WAIT", 30))
 
 class Bot_Commands(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.triggers = Trigger_Engine(load_triggers(TRIGGERS_FILE))
+        self.limiter = Response_Limiter()
+        self.emojis = {}
+        # channel id -> (channel, replies waiting to be sent)
+        self.pending_replies = {}
+        self.reply_tasks = {}
+
+    # Emojis only get looked up once, but a missing one
+    # gets tried again next time in case the cache wasn't ready yet.
+    def get_emoji(self, emoji_id: int):
+        if emoji_id not in self.emojis:
+            emoji = self.bot.get_emoji(emoji_id)
+            if not emoji:
+                return None
+            self.emojis[emoji_id] = emoji
+        return self.emojis[emoji_id]
 
     @commands.Cog.listener()
     async def on_message(self, message):
         if message.author == self.bot.user:
             return
-        if "/shrug" in message.content.lower():
-            await message.channel.send("¯\\_(ツ)_/¯")
-        if "good bot" in message.content.lower():
-            emoji = self.bot.get_emoji(1058902343539761274)
-            if emoji:
-                await message.channel.send(f"{emoji}")
-        if "bad bot" in message.content.lower():
-            emoji = self.bot.get_emoji(1380412150429909012)
-            if emoji:
-                await message.channel.send(f"I am what I was made to be, blame my creator instead.")
-                await message.channel.send(f"{emoji}")
-        if "hell yeah" in message.content.lower():
-            emoji = self.bot.get_emoji(1058884605752643654)
-            if emoji:
-                await message.channel.send(f"{emoji}")
-        if "just write" in message.content.lower():
-            await message.channel.send(f"it's that easy.")
-        if "trans rights" in message.content.lower():
-            emoji = self.bot.get_emoji(1408953964539416616)
-            if emoji:
-                await message.channel.send(f"{emoji}")
+        for index, trigger in self.triggers.fire(message.content, message.channel.id):
+            emoji = None
+            if "emoji" in trigger:
+                emoji = self.get_emoji(trigger["emoji"])
+                # Emoji replies are skipped entirely if the emoji isn't available.
+                if not emoji:
+                    continue
+            if not self.limiter.allow(message.channel.id, trigger):
+                continue
+            for response in trigger["responses"]:
+                self.queue_reply(message.channel, response.replace("{emoji}", f"{emoji}"))
+            self.triggers.mark_fired(index, message.channel.id)
+                
+    def queue_reply(self, channel, text: str):
+        self.pending_replies.setdefault(channel.id, (channel, []))[1].append(text)
+        if channel.id not in self.reply_tasks:
+            self.reply_tasks[channel.id] = asyncio.create_task(self.send_replies(channel.id))
             
+    async def send_replies(self, channel_id: int):
+        await asyncio.sleep(REPLY_BATCH_WINDOW)
+        # Novelty replies wait while the channel is close to its rate limit,
+        # anything triggered meanwhile joins the same message.
+        waited = 0
+        allowed = SEND_BUDGET.spend(channel_id, LOW)
+        while not allowed and waited < REPLY_MAX_WAIT:
+            delay = max(SEND_BUDGET.wait_time(channel_id), 0.1)
+            await asyncio.sleep(delay)
+            waited += delay
+            allowed = SEND_BUDGET.spend(channel_id, LOW)
+        channel, replies = self.pending_replies.pop(channel_id)
+        del self.reply_tasks[channel_id]
+        
+        if not allowed:
+            print(f"Dropped {len(replies)} replies in {channel}, it stayed busy for {REPLY_MAX_WAIT:.0f}s.")
+            return
+        await channel.send("\n".join(replies)[:2000])
+
+    @commands.command(name="reload_triggers")
+    @commands.is_owner()
+    async def reload_triggers(self, ctx):
+        self.triggers = Trigger_Engine(load_triggers(TRIGGERS_FILE))
+        await ctx.send(f"Loaded {len(self.triggers.triggers)} triggers.")
+        
+    @commands.command(name="scheduler_status")
+    @commands.is_owner()
+    async def scheduler_status(self, ctx):
+        lines = [
+            f"`{name}` ({spec}): next {next_run.isoformat() if next_run else 'never'}, "
+            f"last {last_run.isoformat() if last_run else 'never'}"
+            for name, spec, next_run, last_run in SCHEDULER.status()
+        ]
+        await ctx.send("\n".join(lines)[:2000] or "No jobs scheduled.")
+
 async def setup(bot):
-    await bot.add_cog(Bot_Commands(bot))
\ No newline at end of file
+    await bot.add_cog(Bot_Commands(bot))
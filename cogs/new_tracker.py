@@ -1,4 +1,4 @@
-from discord.ext import commands, tasks
+from discord.ext import commands
 from zoneinfo import ZoneInfo
 from dotenv import load_dotenv
 load_dotenv()
@@ -6,460 +6,837 @@ from datetime import timedelta, timezone
 import datetime
 import discord
 import asyncio
-import json, os
+import os
 import copy
+import time
+from utils.edit_queue import Edit_Queue
+from utils.json_store import Json_Store, atomic_write_json, read_json
+from utils.sqlite_store import Sqlite_Store
+from utils.scoring import Score_Engine, score_days
+from utils.replay import history_from_snapshots, rebuild_scores
+from utils.member_cache import Member_Cache
+from utils.message_packer import send_all
+from utils.scheduler import SCHEDULER
+from utils.day_window import CATEGORIES, Day_Window, window_from_legacy, to_json
 
 DATA_FILE = "data/new_tracker.json"
 META_FILE = "data/new_meta.json"
 LOG_FILE = "data/new_meta_log.json"
+MEMBER_NAMES_FILE = "data/member_names.json"
+DB_FILE = "data/new_tracker.db"
+# Where a rollover writes down its progress, see finish_rollover.
+JOURNAL_FILE = "data/rollover_journal.json"
+# Hashes of what each tracker message was last edited to.
+RENDERED_FILE = "data/rendered_messages.json"
+# One entry per server the tracker runs in, see load_tracker_configs.
+TRACKERS_FILE = "data/trackers.json"
+TRACKER_DIR = "data/trackers"
+# "json" keeps history as daily snapshots in LOG_FILE,
+# "sqlite" keeps one row per reaction in DB_FILE instead.
+BACKEND = os.getenv("TRACKER_BACKEND", "json")
 CHANNEL = "TRACKER_CHANNEL_ID"
-DAYS = ["two days ago's ", "yesterday's ", "today's "]
 READING_EMOJI = "frogReading"
 WRITING_EMOJI = "bulbaWriter"
+DEFAULT_CONFIG = {
+    "timezone": "America/Los_Angeles",
+    "post_time": "22:00",
+    "reading_emoji": {"name": READING_EMOJI, "id": 1397736959882956842},
+    "writing_emoji": {"name": WRITING_EMOJI, "id": 1061522051501928498},
+    "backend": BACKEND,
+    # How many days back a reaction still counts, today included.
+    "window": 3,
+    # How many of each ranking the leaderboard message shows, the rest is behind /leaderboard.
+    "leaderboard_size": 10,
+    # Messages in the channel older than this get deleted once a day, null turns that off.
+    # Old leaderboards go right away, and anything the tracker still uses always stays.
+    "cleanup_after_days": 3,
+}
+# Users per /leaderboard page.
+LEADERBOARD_PAGE = 20
+LEADERBOARD_CATEGORIES = {"reading": "readers", "read": "readers", "writing": "writers", "write": "writers"}
+# How many tracker messages or reaction user lists get fetched at once on startup.
+RECONCILE_CONCURRENCY = 4
+# Seconds between edits of the same message, bursts of reactions in between get merged.
+EDIT_WINDOW = float(os.getenv("TRACKER_EDIT_WINDOW", 2))
+# Discord won't bulk delete anything older than two weeks, with some slack for the time it takes.
+BULK_DELETE_AGE = timedelta(days=14) - timedelta(minutes=5)
+# Minutes after the daily post that the channel gets cleaned up.
+CLEANUP_DELAY = 2
 
-def load_data():
-    if not os.path.exists(DATA_FILE):
-        return {}
-    with open(DATA_FILE, "r") as f:
-        return json.load(f)
-    
-def load_meta():
-    if not os.path.exists(META_FILE):
-        return {}
-    with open(META_FILE, "r") as f:
-        return json.load(f)
+def load_log(path: str = LOG_FILE):
+    return read_json(path)
 
-def save_data(data):
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=2)
-        
-def save_meta(meta):
-    with open(META_FILE, "w") as f:
-        json.dump(meta, f, indent=2)
-        
-def load_log():
-    if not os.path.exists(LOG_FILE):
-        return {}
-    with open(LOG_FILE, "r") as f:
-        return json.load(f)
-    
-def save_log(log):
-    with open(LOG_FILE, "w") as f:
-        json.dump(log, f, indent=2)
+def save_log(log, path: str = LOG_FILE):
+    atomic_write_json(path, log)
 
-class New_Tracker(commands.Cog):
-    def __init__(self, bot):
+# TRACKERS_FILE maps a tracker name to its settings, e.g.
+# {"sheep": {"channel_id": 123, "timezone": "Europe/London", "post_time": "21:30",
+#            "reading_emoji": {"name": "frogReading", "id": 456}, ...}}
+# and every tracker keeps its files in TRACKER_DIR/<name>/.
+# Without that file the single tracker from TRACKER_CHANNEL_ID
+# keeps using the original data files.
+def load_tracker_configs() -> dict:
+    configs = {}
+    for name, config in read_json(TRACKERS_FILE).items():
+        folder = os.path.join(TRACKER_DIR, name)
+        configs[name] = {
+            **DEFAULT_CONFIG,
+            "files": {
+                "data": os.path.join(folder, "tracker.json"),
+                "meta": os.path.join(folder, "meta.json"),
+                "log": os.path.join(folder, "meta_log.json"),
+                "names": os.path.join(folder, "member_names.json"),
+                "db": os.path.join(folder, "tracker.db"),
+                "journal": os.path.join(folder, "rollover_journal.json"),
+                "rendered": os.path.join(folder, "rendered_messages.json"),
+            },
+            **config,
+        }
+    if not configs and os.getenv(CHANNEL):
+        configs["default"] = {
+            **DEFAULT_CONFIG,
+            "channel_id": os.getenv(CHANNEL),
+            "files": {"data": DATA_FILE, "meta": META_FILE, "log": LOG_FILE, "names": MEMBER_NAMES_FILE, "db": DB_FILE,
+                      "journal": JOURNAL_FILE, "rendered": RENDERED_FILE},
+        }
+    return configs
+
+# Everything one server's tracker needs. Each one has its own files,
+# lock and edit queue, so nothing one server does ever waits on another.
+class Guild_Tracker:
+    def __init__(self, bot, name: str, config: dict):
         self.bot = bot
+        self.name = name
+        self.config = config
+        self.files = config["files"]
+        self.timezone = ZoneInfo(config["timezone"])
+        # A cron spec in the tracker's own timezone, post_time is the simple version of it.
+        hour, minute = config["post_time"].split(":")
+        self.schedule = config.get("schedule", f"{int(minute)} {int(hour)} * * *")
+        cleanup_hour, cleanup_minute = divmod((int(hour) * 60 + int(minute) + CLEANUP_DELAY) % (24 * 60), 60)
+        self.cleanup_schedule = config.get("cleanup_schedule", f"{cleanup_minute} {cleanup_hour} * * *")
+        
         self.data_lock = asyncio.Lock()
-        self.tracker_message_ids = None
+        self.window = None
         self.leaderboard_message_id = None
         self.channel = None
         self.guild = None
         self.writing_emoji = None
         self.reading_emoji = None
-        self.member_names = None
+        self.member_names = Member_Cache(self.files["names"])
+        self.edit_queue = Edit_Queue(window=EDIT_WINDOW, rendered_path=self.files["rendered"])
         
-        try:
-            with open(META_FILE, "r") as f:
-                meta = json.load(f)
-                self.tracker_message_ids = meta.get("tracker_message_ids", [])
-                self.leaderboard_message_id = meta.get("leaderboard_message_id")
-
-                # Daily writers and readers are no longer local,
-                # saving them in meta.json instead means they aren't reset
-                # if the bot crashses or is intentionally rebooted.
-                self.today_readers = set(meta.get("today's readers", []))
-                self.yesterday_readers = set(meta.get("yesterday's readers", []))
-                self.two_days_ago_readers = set(meta.get("two days ago's readers", []))
-                self.today_writers = set(meta.get("today's writers", []))
-                self.yesterday_writers = set(meta.get("yesterday's writers", []))
-                self.two_days_ago_writers = set(meta.get("two days ago's writers", []))
-        except FileNotFoundError:
-            pass
-
-    async def cog_load(self):
-        self.member_names = {}
-        self.run_daily_update.start()
-        # self.delete_old_messages.start()
-     
-            
-    @commands.Cog.listener()
-    async def on_ready(self):
+        # data and meta live in memory and are only written back to disk
+        # in the background, so reactions never wait on file I/O.
+        self.data_store = Json_Store(self.files["data"])
+        self.meta_store = Json_Store(self.files["meta"], default=to_json)
+        self.data = None
+        self.meta = None
+        self.history = Sqlite_Store(self.files["db"]) if config["backend"] == "sqlite" else None
+        self.scores = Score_Engine()
+        self.recovery = None
+        # Set once recover() is done. Rollovers and reactions wait for it, so neither
+        # can get in before the reactions missed while the bot was down are back.
+        self.recovered = asyncio.Event()
+    
+    async def load(self):
+        for path in self.files.values():
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.data = self.data_store.load()
+        self.meta = self.meta_store.load()
+        
+        # Daily writers and readers are no longer local,
+        # saving them in meta.json instead means they aren't reset
+        # if the bot crashses or is intentionally rebooted.
+        # meta holds the window itself, it's turned back into json when saved.
+        today = datetime.datetime.now(self.timezone).date().isoformat()
+        if "days" in self.meta:
+            self.window = Day_Window(self.config["window"])
+            dropped = self.window.load(self.meta["days"])
+            self.window.fill(self.meta.get("last_updated_date") or today)
+            if len(self.meta["days"]) != len(self.window):
+                self.meta_store.mark_dirty()
+        else:
+            self.window, dropped = window_from_legacy(self.meta, self.config["window"], today)
+            self.meta_store.mark_dirty()
+        self.meta["days"] = self.window
+        # A shorter window than last time has no room for its oldest days,
+        # they get scored now or they'd never be.
+        if dropped:
+            score_days(self.data, dropped)
+            self.data_store.mark_dirty()
+        self.leaderboard_message_id = self.meta.get("leaderboard_message_id")
+        self.scores.rebuild(self.data, self.window)
+        
+        if self.history:
+            await self.history.open()
+            if await self.history.submit(self.history.is_empty):
+                await self.migrate_history()
+            elif dropped:
+                self.history.defer(self.history.save_scores, copy.deepcopy(self.data))
+        
+        self.member_names.load()
+    
+    async def close(self):
+        await self.edit_queue.flush()
+        await self.data_store.flush()
+        await self.meta_store.flush()
+        await self.member_names.flush()
+        if self.history:
+            await self.history.close()
+    
+    # Looks up the channel and emojis once the bot can see them.
+    def resolve(self):
         if not self.channel:
-            channel_id = os.getenv(CHANNEL)
-            if channel_id:
-                self.channel = self.bot.get_channel(int(channel_id))
+            self.channel = self.bot.get_channel(int(self.config["channel_id"]))
+            if self.channel:
                 self.guild = self.channel.guild
-                print(f"on ready: using {self.channel}")
-        self.writing_emoji = self.bot.get_emoji(1061522051501928498)
-        self.reading_emoji = self.bot.get_emoji(1397736959882956842)
-              
-    def cog_unload(self):
-        self.run_daily_update.cancel()
-        self.delete_old_messages.cancel()
-        
-    async def resolve_member_name(self, user_id: int) -> str:
-        # Try cached lookup first
-        member = self.guild.get_member(user_id)
-        if not member:
-            try:
-                member = await self.guild.fetch_member(user_id)
-            except Exception:
-                return f"Unknown User ({user_id})"
-
-        return member.display_name
+                print(f"{self.name} tracker: using {self.channel}")
+        self.reading_emoji = self.bot.get_emoji(self.config["reading_emoji"]["id"])
+        self.writing_emoji = self.bot.get_emoji(self.config["writing_emoji"]["id"])
+    
+    async def migrate_history(self):
+        log = await asyncio.to_thread(load_log, self.files["log"])
+        await self.history.submit(self.history.migrate_from_json, copy.deepcopy(self.data), self.snapshot_meta(), log)
         
-    def format_progress(self, data: dict, today_readers: set, today_writers: set) -> str:
+    @property
+    def tracker_message_ids(self) -> list:
+        return self.window.message_ids()
+    
+    # A plain json copy of meta, for the log and the sqlite migration.
+    def snapshot_meta(self) -> dict:
+        return {**copy.deepcopy({key: value for key, value in self.meta.items() if key != "days"}), "days": self.window.to_json()}
+    
+    # Everyone on the leaderboard and in the day buckets needs a name before rendering.
+    # Only the top of each ranking gets shown, so nobody below it gets looked up.
+    async def ensure_member_names(self):
+        user_ids = self.window.members()
+        for category in CATEGORIES:
+            user_ids |= {user_id for user_id, _ in self.scores.ranking(category, stop=self.config["leaderboard_size"])}
+        await self.member_names.ensure(self.guild, user_ids)
+    
+    def format_progress(self, slot) -> str:
         readers_text = []
         writers_text = []
-
-        for user_id in today_readers:
-            stats = data.get(user_id, {"read": 0})
-            name = self.member_names[user_id]
-            readers_text.append(f"{name}: {stats['read']}")
-            
-        readers_text = sorted(readers_text, key=lambda x: int(x.split(": ")[1]), reverse=True)
-
-        for user_id in today_writers:
-            stats = data.get(user_id, {"write": 0})
-            name = self.member_names[user_id]
-            writers_text.append(f"{name}: {stats['write']}")
+        position = self.window.position(slot)
+        
+        for user_id in slot.members["readers"]:
+            score = self.scores.project(user_id, "readers", position)
+            readers_text.append((score, f"{self.member_names[user_id]}: {score}"))
+        
+        for user_id in slot.members["writers"]:
+            score = self.scores.project(user_id, "writers", position)
+            writers_text.append((score, f"{self.member_names[user_id]}: {score}"))
+        
+        readers_text = [line for _, line in sorted(readers_text, key=lambda x: x[0], reverse=True)]
+        writers_text = [line for _, line in sorted(writers_text, key=lambda x: x[0], reverse=True)]
         
-        writers_text = sorted(writers_text, key=lambda x: int(x.split(": ")[1]), reverse=True)          
-
         return "\n".join(readers_text) or "Nobody yet", "\n".join(writers_text) or "Nobody yet"
     
-    def display_current_score(self, data: dict, meta: dict, day: str, past_day_display: bool) -> dict:
-        display_data = {}
+    def streak_header(self, category: str) -> str:
+        if category == "readers":
+            return f"{self.reading_emoji} **Reading Streaks**"
+        return f"{self.writing_emoji } **Writing Streaks**"
         
-        for user_id, stats in data.items():
-            display_data[user_id] = {
-                "read": self.calculate_score(stats["read"], user_id, meta, day, "readers", past_day_display),
-                "write": self.calculate_score(stats["write"], user_id, meta, day, "writers", past_day_display),
-            }
+    # Both rankings come straight from the score engine, already sorted.
+    # Only the top few and nobody at zero, so it stays well under the message limit
+    # however big the server gets. The rest are on /leaderboard.
+    def make_leaderboard(self) -> str:
+        size = self.config["leaderboard_size"]
+        sections = []
+        for category in CATEGORIES:
+            lines = [self.streak_header(category)]
+            for user_id, score in self.scores.ranking(category, stop=size):
+                lines.append(f"{self.member_names[user_id]}: {score}")
+            hidden = self.scores.ranked_count(category) - size
+            if len(lines) == 1:
+                lines.append("Nobody yet")
+            if hidden > 0:
+                lines.append(f"-# ...and {hidden} more, see `/leaderboard`.")
+            sections.append("\n".join(lines))
+        return "\n\n".join(sections)
+    
+    # One page of the full ranking, pages count from 1.
+    async def leaderboard_page(self, category: str, page: int) -> str:
+        total = self.scores.ranked_count(category)
+        pages = max((total + LEADERBOARD_PAGE - 1) // LEADERBOARD_PAGE, 1)
+        page = min(max(page, 1), pages)
+        start = (page - 1) * LEADERBOARD_PAGE
+        ranking = self.scores.ranking(category, start, start + LEADERBOARD_PAGE)
+        await self.member_names.ensure(self.guild, [user_id for user_id, _ in ranking])
         
-        return display_data
+        lines = [f"{self.streak_header(category)} (page {page} of {pages})"]
+        for place, (user_id, score) in enumerate(ranking, start + 1):
+            lines.append(f"{place}. {self.member_names[user_id]}: {score}")
+        if not ranking:
+            lines.append("Nobody has a streak yet.")
+        return "\n".join(lines)
     
-    def calculate_score(self, score: int, user_id: str, meta: dict, current_day: str, category: str, past_day_display: bool) -> int:
-        days = DAYS.copy()
-        if past_day_display:
-            cutoff = DAYS.index(current_day) + 1
-            active_days = DAYS[:cutoff]
-            days = active_days
-            
-        for day in days:
-            if user_id not in meta[day + category] and day != "today's ":
-                score //= 2
-            elif user_id in meta[day + category]:
-                score += 1
-
-        return score
+    # Where one user stands in both rankings, without rendering either of them.
+    def rank_text(self, member) -> str:
+        user_id = str(member.id)
+        lines = []
+        for category, name in zip(CATEGORIES, ("reading", "writing")):
+            place = self.scores.rank(user_id, category)
+            if place is None:
+                lines.append(f"No {name} streak yet.")
+            else:
+                lines.append(
+                    f"#{place} of {self.scores.ranked_count(category)} for {name}, "
+                    f"with a streak of {self.scores.score(user_id, category)}."
+                )
+        return f"**{member.display_name}**\n" + "\n".join(lines)
     
-    def make_leaderboard(self, sorted_by_read: list, sorted_by_write: list, read_lines: list, write_lines: list) -> str:
-        for user_id, scores in sorted_by_read:
-            name = self.member_names[user_id]
-            read_lines.append(f"{name}: {scores['read']}")
-        
-        for user_id, scores in sorted_by_write:
-            name = self.member_names[user_id]
-            write_lines.append(f"{name}: {scores['write']}")
-        
-        return "\n".join(read_lines + ["", *write_lines])
+    # Edits go through the queue so a burst of reactions doesn't
+    # turn into one HTTP request per reaction per message.
+    def safely_edit_message(self, message_id: int, new_content: str):
+        self.edit_queue.schedule(self.channel, message_id, new_content)
     
-    async def safely_edit_message(self, message_id: int, new_content: str):
-        try:
-            message = self.channel.get_partial_message(message_id)
-            await message.edit(content=new_content)
-        except Exception as e:
-            print(f"Couldn't edit message {message_id}: {e}")
-
-    @tasks.loop(time=datetime.time(hour=22, minute=0, tzinfo=ZoneInfo("America/Los_Angeles")))
-    async def run_daily_update(self):
-        print("RUN DAILY UPDATE — FROM LOOP")
-        await self.daily_update()
-        
-    @run_daily_update.before_loop
-    async def before_daily_update(self):
+    # Run by the scheduler, which passes the time the update was meant for.
+    async def scheduled_update(self, scheduled: datetime.datetime):
         await self.bot.wait_until_ready()
-
-    async def daily_update(self):
-        PST = ZoneInfo("America/Los_Angeles")
-        now = datetime.datetime.now(PST)
-        print(f"daily tracker update posted at {now.strftime('%Y-%m%d %H:%M%S %Z')}")
+        await self.daily_update(scheduled)
+        
+    # now is the scheduled time when catching up, so a late
+    # update is still dated for the day it should have run.
+    # force runs it again even if today's update already happened.
+    async def daily_update(self, now: datetime.datetime = None, force: bool = False):
+        now = now or datetime.datetime.now(self.timezone)
+        print(f"{self.name} daily tracker update posted at {now.strftime('%Y-%m%d %H:%M%S %Z')}")
         await self.bot.wait_until_ready()
         
         # These two lines are intentionally redundant,
-        # because on_ready already loads the channel, 
+        # because on_ready already loads the channel,
         # but I have them here as a sanity check.
         if not self.channel:
-            self.channel = self.bot.get_channel(int(os.getenv(CHANNEL)))
-            self.guild = self.channel.guild
+            self.resolve()
+            
+        # A catch-up rollover queued for the downtime would otherwise score
+        # the oldest day and push it out before its missed reactions are read back.
+        await self.recovered.wait()
         
+        today_str = now.date().isoformat()
         
-        today_str = datetime.datetime.now(PST).date().isoformat()
+        async with self.data_lock:
+            # A rollover that got cut off always gets finished first.
+            journal = await asyncio.to_thread(read_json, self.files["journal"])
+            if journal:
+                print(f"Finishing the interrupted rollover for {journal['date']}.")
+                await self.finish_rollover(journal)
+                
+            # Prevents duplicate penalty if already updated today.
+            if self.meta.get("last_updated_date") == today_str and not force:
+                print("Daily update already performed today.")
+                return
             
+            journal = await self.begin_rollover(now)
+            await self.finish_rollover(journal)
+            
+    # Finishes a rollover left in the journal when the bot went down, before any new reactions.
+    async def resume_rollover(self):
         async with self.data_lock:
-            data = load_data()
-            meta = load_meta()
+            journal = await asyncio.to_thread(read_json, self.files["journal"])
+            if journal:
+                print(f"{self.name}: resuming the interrupted rollover for {journal['date']}.")
+                await self.finish_rollover(journal)
+                
+    # Works out everything the rollover is going to do and writes it
+    # to the journal before anything is changed or posted.
+    async def begin_rollover(self, now: datetime.datetime) -> dict:
+        data = self.data
+        meta = self.meta
+        await self.ensure_member_names()
+        
+        # Every day the bot was down counts as a daily update of its own,
+        # so a streak nobody kept up gets halved once per missed day.
+        periods = 1
+        if meta.get("last_updated_date"):
+            periods = max((now.date() - datetime.date.fromisoformat(meta["last_updated_date"])).days, 1)
             
-            # # Prevents duplicate penalty if already updated today.
-            # Due to the way this code currently loops, this is unnecessary.
-            # if meta["last_updated_date"] ==  today_str:
-            #     print("Daily update already performed today.")
-            #     return
+        # Updates scores and member names.
+        # Currently, the penalty is that their score is divided by two.
+        # The new scores go in the journal as they are, so applying them twice changes nothing.
+        scores = {}
+        for user_id in data:
+            scores[user_id] = dict(data[user_id])
+            scores[user_id]["read"] = self.scores.roll_over(user_id, "readers", periods)
+            scores[user_id]["write"] = self.scores.roll_over(user_id, "writers", periods)
             
-            for user_id in data:
-                if (user_id not in self.member_names):
-                    self.member_names[user_id] = await self.resolve_member_name(int(user_id))
+        # The leaderboard shows the scores projected before the rollover.
+        leaderboard = self.make_leaderboard()
+        if periods > 1:
+            leaderboard = f"-# Caught up on {periods - 1} missed days.\n" + leaderboard
             
-            deep_copy = self.display_current_score(data, meta, day="today's ", past_day_display=False)
+        # Resets so it still displays the daily message.
+        today = now.date().strftime("%A, %B %d, %Y")
+        tracker_text = f"Today is **{today}**.\n React with {self.reading_emoji} if you read today and {self.writing_emoji} if you wrote today."
+        
+        journal = {
+            "date": now.date().isoformat(),
+            "title": today,
+            "started": datetime.datetime.now(timezone.utc).isoformat(),
+            "periods": periods,
+            "scores": scores,
+            "leaderboard": leaderboard,
+            "tracker_text": tracker_text,
+        }
+        await self.save_journal(journal)
+        return journal
+    
+    # Every step is marked in the journal once it's done and skipped
+    # if it already is, so running this again after a crash picks up
+    # where it stopped instead of halving everyone's scores twice.
+    async def finish_rollover(self, journal: dict):
+        data = self.data
+        meta = self.meta
+        
+        if not journal.get("scored"):
+            # Updated in place since the store and score engine hold on to this dict.
+            data.update(copy.deepcopy(journal["scores"]))
+            await self.data_store.save()
+            if self.history:
+                self.history.defer(self.history.save_scores, copy.deepcopy(data))
+            journal["scored"] = True
+            await self.save_journal(journal)
             
-            # Updates scores and member names.
-            # Currently, the penalty is that their score is divided by two.
-            two_days_ago_readers = set(meta["two days ago's readers"])
-            two_days_ago_writers = set(meta["two days ago's writers"])
-            for user_id in data:
-                if user_id not in two_days_ago_readers:
-                    data[user_id]["read"] = data[user_id]["read"] // 2
-                else:
-                    data[user_id]["read"] += 1
-                if user_id not in two_days_ago_writers:
-                    data[user_id]["write"] = data[user_id]["write"] // 2
-                else:
-                    data[user_id]["write"] += 1
-
-            save_data(data)
+        if not journal.get("leaderboard_message_id"):
+            leaderboard_msg = await self.post_once(journal["leaderboard"], journal)
+            journal["leaderboard_message_id"] = leaderboard_msg.id
+            await self.save_journal(journal)
             
-            sorted_by_read = sorted(deep_copy.items(), key=lambda item: item[1]['read'], reverse=True)
-            sorted_by_write = sorted(deep_copy.items(), key=lambda item: item[1]['write'], reverse=True)
+        if not journal.get("tracker_message_id"):
+            msg = await self.post_once(journal["tracker_text"], journal)
+            journal["tracker_message_id"] = msg.id
+            await self.save_journal(journal)
             
-            read_lines = [f"{self.reading_emoji} **Reading Streaks**"]
-            write_lines = [f"{self.writing_emoji } **Writing Streaks**"]
-
-            leaderboard_msg = await self.channel.send(self.make_leaderboard(
-                                                        sorted_by_read, 
-                                                        sorted_by_write, 
-                                                        read_lines, write_lines
-                                                        ))
-            self.leaderboard_message_id = leaderboard_msg.id
-
-            # Resets so it still displays the daily message.
-            today = datetime.date.today().strftime("%A, %B %d, %Y")
-            msg = await self.channel.send(
-                f"Today is **{today}**.\n React with {self.reading_emoji} if you read today and {self.writing_emoji} if you wrote today."
-            )
+        if not journal.get("reacted"):
+            # Adding a reaction that's already there does nothing.
+            msg = self.channel.get_partial_message(journal["tracker_message_id"])
             await msg.add_reaction(str(self.reading_emoji))
             await msg.add_reaction(str(self.writing_emoji))
+            journal["reacted"] = True
+            await self.save_journal(journal)
             
-            # Logging for scoring history for potential bugfixes.
-            log = load_log()
-            log[today] = meta
-            save_log(log)
+        if not journal.get("rotated"):
+            # A crash after meta was saved but before the journal was leaves the new
+            # message already in the window, and advancing again would push out a real day.
+            # Checked by message id rather than date, a forced rerun keeps the same date.
+            if self.window.today.message_id != journal["tracker_message_id"]:
+                # Logging for scoring history for potential bugfixes.
+                # The snapshot is copied since meta keeps changing in memory.
+                # The sqlite backend already has every reaction as its own row.
+                if not self.history:
+                    log = await asyncio.to_thread(load_log, self.files["log"])
+                    log[journal["title"]] = self.snapshot_meta()
+                    await asyncio.to_thread(save_log, log, self.files["log"])
+                    
+                # Updates for retroactive scoring.
+                # Missed days get empty slots of their own, so every message keeps its date.
+                self.window.advance(journal["date"], journal.get("periods", 1), journal["tracker_message_id"])
+                meta["leaderboard_message_id"] = journal["leaderboard_message_id"]
+                meta["last_updated_date"] = journal["date"]
+                await self.meta_store.save()
+            self.leaderboard_message_id = journal["leaderboard_message_id"]
+            self.edit_queue.forget(self.tracker_message_ids + [self.leaderboard_message_id])
+            journal["rotated"] = True
+            await self.save_journal(journal)
             
-            # Updates for retroactive scoring.
-            meta["two days ago's readers"] = meta["yesterday's readers"] 
-            meta["two days ago's writers"] = meta["yesterday's writers"] 
-            meta["yesterday's readers"] = meta["today's readers"]
-            meta["yesterday's writers"] = meta["today's writers"]
-            self.today_readers = set()
-            self.today_writers = set()
-            meta["today's readers"] = list(self.today_readers)
-            meta["today's writers"] = list(self.today_writers)
+        await asyncio.to_thread(atomic_write_json, self.files["journal"], {})
+        self.scores.rebuild(data, self.window)
+        
+    async def save_journal(self, journal: dict):
+        await asyncio.to_thread(atomic_write_json, self.files["journal"], journal)
+        
+    # A crash between sending a message and saving its id to the journal
+    # would post it twice, so anything this rollover already sent gets reused.
+    async def post_once(self, text: str, journal: dict):
+        started = datetime.datetime.fromisoformat(journal["started"])
+        async for message in self.channel.history(limit=10, after=started):
+            if message.author == self.bot.user and message.content == text:
+                return message
+        message, = await send_all(self.channel, [text])
+        return message
+    
+    # Message ids are timestamps, so the age cutoffs turn into snowflakes
+    # and history only ever walks the messages that are getting deleted.
+    # Anything under two weeks old goes in bulk deletes of up to 100 at a time,
+    # only what's older than that has to be deleted one by one.
+    async def cleanup_channel(self, scheduled: datetime.datetime = None) -> int:
+        await self.bot.wait_until_ready()
+        if not self.channel:
+            self.resolve()
+        days = self.config["cleanup_after_days"]
+        if not self.channel or not days:
+            return 0
+        
+        # A rollover that's halfway through might have posted messages meta doesn't know about yet.
+        journal = await asyncio.to_thread(read_json, self.files["journal"])
+        keep = set(self.tracker_message_ids)
+        keep |= {self.leaderboard_message_id, journal.get("leaderboard_message_id"), journal.get("tracker_message_id")}
+        
+        now = datetime.datetime.now(timezone.utc)
+        too_old = discord.utils.time_snowflake(now - timedelta(days=days))
+        bulk_limit = discord.utils.time_snowflake(now - BULK_DELETE_AGE)
+        start = time.monotonic()
+        deleted = 0
+        
+        def old_leaderboard(message) -> bool:
+            return message.id not in keep and message.author == self.bot.user and "Reading Streaks" in message.content
+        
+        def unused(message) -> bool:
+            return message.id not in keep
+        
+        try:
+            deleted += len(await self.channel.purge(limit=None, after=discord.Object(too_old), check=old_leaderboard))
+            if too_old > bulk_limit:
+                deleted += len(await self.channel.purge(
+                    limit=None, before=discord.Object(too_old), after=discord.Object(bulk_limit), check=unused
+                ))
+        except discord.Forbidden:
+            print(f"{self.name}: no permission to delete messages in {self.channel}")
+            return 0
+        except discord.HTTPException as e:
+            print(f"{self.name}: bulk delete failed: {e}")
             
-            self.tracker_message_ids.append(msg.id)
-            if len(self.tracker_message_ids) > 3:
-                self.tracker_message_ids.pop(0)
+        async for message in self.channel.history(limit=None, before=discord.Object(min(too_old, bulk_limit))):
+            if not unused(message):
+                continue
+            try:
+                await message.delete()
+                deleted += 1
+            except discord.Forbidden:
+                print(f"Cannot delete message {message.id}")
+            except discord.HTTPException as e:
+                print(f"Failed to delete message {message.id} : {e}")
+                
+        print(f"{self.name}: deleted {deleted} old messages in {time.monotonic() - start:.1f}s")
+        return deleted
+    
+    # Rebuilds every score from the recorded history, for when a bug messed them up.
+    # Only reports what would change unless called with "apply".
+    async def replay_history(self, ctx, mode: str = ""):
+        # Only copying what the replay needs holds the lock, reactions
+        # don't have to wait on the replay itself or on sending the report.
+        async with self.data_lock:
+            last_updated = self.meta.get("last_updated_date")
+            if not last_updated:
+                await ctx.send("The tracker hasn't rolled over yet, there's no history to replay.")
+                return
+            data = copy.deepcopy(self.data)
+            meta = self.snapshot_meta()
+            last_scored = self.window.scored_through()
             
-            meta["tracker_message_ids"] = self.tracker_message_ids
-            meta["leaderboard_message_id"] = self.leaderboard_message_id
-            meta["last_updated_date"] = today_str
+        if self.history:
+            history = await self.history.submit(self.history.history)
+        else:
+            log = await asyncio.to_thread(load_log, self.files["log"])
+            history = history_from_snapshots(list(log.values()) + [meta])
             
-            save_meta(meta)
+        # The window's days haven't been scored by a daily update yet.
+        rebuilt, vectorized_time, loop_time, mismatches, gaps = await asyncio.to_thread(
+            rebuild_scores, copy.deepcopy(data), history, last_scored
+        )
+        changed = [user_id for user_id in rebuilt if data.get(user_id) != rebuilt[user_id]]
+        
+        await ctx.send(
+            f"Replayed {len(history)} days for {len(rebuilt)} users in {vectorized_time * 1000:.1f}ms "
+            f"(plain loop: {loop_time * 1000:.1f}ms). {len(changed)} users would change."
+        )
+        if mismatches:
+            await ctx.send(f"Vectorized replay disagrees with the loop for {len(mismatches)} users, not applying.")
+            return
+        # Scores get rebuilt from zero, so a stretch the log doesn't cover would
+        # halve everyone down to nothing instead of keeping what they had.
+        if gaps:
+            await ctx.send(
+                f"History is missing {len(gaps)} days between {gaps[0]} and {gaps[-1]}, "
+                f"so the replay can't be trusted and won't be applied."
+            )
+            return
+        if mode != "apply":
+            return
         
+        async with self.data_lock:
+            # Reactions never touch data, only a rollover does, and then the replay is out of date.
+            stale = self.meta.get("last_updated_date") != last_updated or self.data != data
+            if not stale:
+                # Updated in place since the store and score engine hold on to this dict.
+                self.data.clear()
+                self.data.update(rebuilt)
+                self.data_store.mark_dirty()
+                if self.history:
+                    self.history.defer(self.history.save_scores, copy.deepcopy(self.data))
+                self.scores.rebuild(self.data, self.window)
+        if stale:
+            await ctx.send("The tracker rolled over during the replay, nothing applied. Run it again.")
+        else:
+            await ctx.send("Rebuilt scores saved.")
+    
+    def category_for(self, emoji_name: str):
+        if emoji_name == self.config["reading_emoji"]["name"]:
+            return "readers"
+        elif emoji_name == self.config["writing_emoji"]["name"]:
+            return "writers"
+        return None
+    
+    # Adds or removes user from a day, the caller holds data_lock
+    # and marks meta dirty. Returns whether anything changed.
+    def apply_reaction(self, slot, category: str, user_id: str, added: bool) -> bool:
+        if added == self.scores.has(slot, category, user_id):
+            return False
+        if user_id not in self.data:
+            self.data[user_id] = {"read": 0, "write": 0}
+            self.data_store.mark_dirty()
+        self.scores.set_member(slot, category, user_id, added)
+        if self.history:
+            self.history.defer(self.history.set_reaction, user_id, slot.date, category, added)
+        return True
+    
+    async def on_raw_reaction(self, payload, added: bool):
+        # Makes sure it's reacting to a tracker message still in the window.
+        slot = self.window.slot_for(payload.message_id)
+        if not slot:
+            # print(f"message id not in list, id: {payload.message_id}")
+            return
+        
+        category = self.category_for(payload.emoji.name)
+        user_id = str(payload.user_id)
+        print(f"payload.emoji.name = {payload.emoji.name}")
+        if not category:
+            return
+        
+        # Anything that arrives while reconciling is newer than what got fetched,
+        # so it's applied on top once that's done.
+        await self.recovered.wait()
+        async with self.data_lock:
+            updated = self.apply_reaction(slot, category, user_id, added)
+            if updated:
+                self.meta_store.mark_dirty()
+        if updated:
+            await self.refresh_messages(slot)
+            
+    def progress_message(self, slot) -> str:
+        readers_text, writers_text = self.format_progress(slot)
+        return (
+            f"React with {self.reading_emoji} if you read today and {self.writing_emoji} if you wrote today.\n\n"
+            f"**Today's readers:**\n{readers_text}\n\n"
+            f"**Today's writers:**\n{writers_text}"
+        )
+    
+    # Re-renders the leaderboard and the tracker messages a change on slot's day could affect.
+    async def refresh_messages(self, slot):
+        await self.ensure_member_names()
+        
+        self.safely_edit_message(self.leaderboard_message_id, self.make_leaderboard())
+        
+        # Retroactively alters current and any existing future days based on new info.
+        # Days before the one reacted to project the same as before, so they're left alone.
+        for position in range(self.window.position(slot), len(self.window)):
+            later = self.window[position]
+            if later.message_id:
+                self.safely_edit_message(later.message_id, self.progress_message(later))
+                
+    # Everything that has to happen once the channel is there, before reactions count again.
+    async def recover(self):
+        try:
+            await self.resume_rollover()
+            await self.reconcile_reactions()
+        finally:
+            self.recovered.set()
+        
+    # Reactions added or removed while the bot was down never showed up
+    # as events, so the live tracker messages get read back and only
+    # the difference is applied, in one go with one re-render.
+    async def reconcile_reactions(self):
+        start = time.monotonic()
+        limit = asyncio.Semaphore(RECONCILE_CONCURRENCY)
+        
+        async def fetch_message(message_id: int):
+            async with limit:
+                try:
+                    return await self.channel.fetch_message(message_id)
+                except discord.NotFound:
+                    print(f"Tracker message {message_id} is gone, not reconciling it.")
+                except discord.HTTPException as e:
+                    print(f"Couldn't fetch tracker message {message_id}: {e}")
+                    
+        # reaction.users() pages through 100 users per request.
+        async def fetch_users(reaction) -> set:
+            async with limit:
+                return {str(user.id) async for user in reaction.users() if user.id != self.bot.user.id}
+            
+        message_ids = list(self.tracker_message_ids)
+        try:
+            messages = await asyncio.gather(*(fetch_message(message_id) for message_id in message_ids))
+            messages = [message for message in messages if message is not None]
+            lookups = []
+            for message in messages:
+                for reaction in message.reactions:
+                    category = self.category_for(getattr(reaction.emoji, "name", reaction.emoji))
+                    if category:
+                        lookups.append((self.window.slot_for(message.id), category, reaction))
+            users = await asyncio.gather(*(fetch_users(reaction) for _, _, reaction in lookups))
+        except discord.HTTPException as e:
+            print(f"{self.name}: couldn't reconcile reactions: {e}")
+            return
+        
+        # A fetched message with no reaction left for an emoji means nobody's on it anymore.
+        live = {}
+        for message in messages:
+            for category in ("readers", "writers"):
+                live[(self.window.slot_for(message.id), category)] = set()
+        for (slot, category, _), reacted in zip(lookups, users):
+            live[(slot, category)] |= reacted
+            
+        changed = set()
+        async with self.data_lock:
+            # Rollovers all wait for recovery, so the days can't have moved, but just in case.
+            if self.tracker_message_ids != message_ids:
+                return
+            for (slot, category), reacted in live.items():
+                members = slot.members[category]
+                for user_id in reacted - members:
+                    self.apply_reaction(slot, category, user_id, True)
+                    changed.add(slot)
+                for user_id in members - reacted:
+                    self.apply_reaction(slot, category, user_id, False)
+                    changed.add(slot)
+            if changed:
+                self.meta_store.mark_dirty()
+                
+        print(f"{self.name}: reconciled {len(lookups)} reactions in {time.monotonic() - start:.1f}s, "
+              f"{len(changed)} tracker messages changed.")
+        if changed:
+            await self.refresh_messages(min(changed, key=lambda slot: slot.serial))
+                
+class New_Tracker(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.trackers = {
+            name: Guild_Tracker(bot, name, config)
+            for name, config in load_tracker_configs().items()
+        }
+        # Filled in as channels resolve, reactions and commands find their tracker through it.
+        self.by_guild = {}
+    
+    async def cog_load(self):
+        await asyncio.gather(*(tracker.load() for tracker in self.trackers.values()))
+        # Every tracker is its own job, so servers posting at the same time roll over concurrently.
+        # A tracker's cleanup shares its group, so it never runs in the middle of that tracker's rollover.
+        for name, tracker in self.trackers.items():
+            SCHEDULER.add_job(self.job_name(name), tracker.schedule, tracker.scheduled_update,
+                              tz=tracker.config["timezone"], group=f"tracker:{name}")
+            SCHEDULER.add_job(self.job_name(name, "cleanup"), tracker.cleanup_schedule, tracker.cleanup_channel,
+                              tz=tracker.config["timezone"], group=f"tracker:{name}")
+            
+    @commands.Cog.listener()
+    async def on_ready(self):
+        for tracker in self.trackers.values():
+            tracker.resolve()
+            if tracker.guild:
+                self.by_guild[tracker.guild.id] = tracker
+                # on_ready fires again after reconnects, the rollover only needs resuming once.
+                if tracker.recovery is None:
+                    tracker.recovery = asyncio.create_task(tracker.recover())
+                
+    async def cog_unload(self):
+        for name in self.trackers:
+            SCHEDULER.remove_job(self.job_name(name))
+            SCHEDULER.remove_job(self.job_name(name, "cleanup"))
+        await asyncio.gather(*(tracker.close() for tracker in self.trackers.values()))
+        
+    def job_name(self, name: str, job: str = "daily_update") -> str:
+        return f"tracker:{name}:{job}"
+        
+    def tracker_for(self, guild_id: int):
+        return self.by_guild.get(guild_id)
+    
+    # Only fires with the members intent, otherwise names just refresh once they expire.
+    @commands.Cog.listener()
+    async def on_member_update(self, before, after):
+        tracker = self.tracker_for(after.guild.id)
+        if not tracker:
+            return
+        if after.id in tracker.member_names and before.display_name != after.display_name:
+            tracker.member_names.set(after.id, after.display_name)
+    
+    # Commands act on the tracker of the server they're used in.
+    async def cog_check(self, ctx):
+        ctx.tracker = self.tracker_for(ctx.guild.id) if ctx.guild else None
+        if ctx.tracker:
+            return True
+        await ctx.send("There's no tracker set up for this server.")
+        return False
+    
+    # /leaderboard [reading|writing] [page]
+    @commands.command(name="leaderboard")
+    async def leaderboard(self, ctx, category: str = "reading", page: int = 1):
+        if category.lower() not in LEADERBOARD_CATEGORIES:
+            await ctx.send("Usage: `/leaderboard [reading|writing] [page]`")
+            return
+        await ctx.send(await ctx.tracker.leaderboard_page(LEADERBOARD_CATEGORIES[category.lower()], page))
+    
+    # /rank [member], yourself when nobody is given.
+    @commands.command(name="rank")
+    async def rank(self, ctx, member: discord.Member = None):
+        await ctx.send(ctx.tracker.rank_text(member or ctx.author))
+    
     @commands.command(name="force_daily_tracker")
     @commands.is_owner()
     async def test_daily(self, ctx):
         print(f"TEST COMMAND CALLED by {ctx.author} in {ctx.channel}")
         await ctx.send("Running daily update manually...")
         print("RUN DAILY UPDATE — FROM COMMAND (before call)")
-        await self.daily_update()
+        await ctx.tracker.daily_update(force=True)
         print("RUN DAILY UPDATE — FROM COMMAND (after call)")
-        
-    # @tasks.loop(time=datetime.time(hour=22, minute=2, tzinfo=ZoneInfo("America/Los_Angeles")))
-    # async def delete_old_messages(self):
-    #     MAX_AGE = timedelta(days = 3)
-        
-    #     self.channel = self.bot.get_channel(int(os.getenv(CHANNEL)))
-    #     async for message in self.channel.history(limit=100):
-    #         now = datetime.datetime.now(ZoneInfo("America/Los_Angeles"))
-    #         message_time = message.created_at.astimezone(ZoneInfo("America/Los_Angeles"))
-    #         message_age = now - message_time
-    #         if message_age > MAX_AGE or ("Reading Streaks" in message.content and message_age >= timedelta(hours = 23)):
-    #             try:
-    #                 await message.delete()
-    #                 print("old message deleted")
-    #                 await asyncio.sleep(1)
-    #             except discord.Forbidden:
-    #                 print(f"Cannot delete message {message.id}")
-    #             except discord.HTTPException as e:
-    #                 print(f"Failed to delete message {message.id} : {e}")
-    
-    # @delete_old_messages.before_loop
-    # async def before_delete_old_messages(self):
-    #     await self.bot.wait_until_ready()
-        
+    
+    @commands.command(name="tracker_migrate_history")
+    @commands.is_owner()
+    async def migrate_history_command(self, ctx):
+        tracker = ctx.tracker
+        if not tracker.history:
+            await ctx.send("The tracker isn't using the sqlite backend.")
+            return
+        async with tracker.data_lock:
+            await tracker.migrate_history()
+        await ctx.send("Tracker history migrated.")
+    
+    @commands.command(name="tracker_replay")
+    @commands.is_owner()
+    async def replay_history(self, ctx, mode: str = ""):
+        await ctx.tracker.replay_history(ctx, mode)
+    
+    @commands.command(name="tracker_edit_stats")
+    @commands.is_owner()
+    async def edit_stats(self, ctx):
+        stats = ctx.tracker.edit_queue.stats()
+        await ctx.send(
+            f"Edits sent: {stats['sent']}, coalesced: {stats['coalesced']}, "
+            f"dropped: {stats['dropped']}, unchanged: {stats['unchanged']}, pending: {stats['pending']}"
+        )
+    
+    @commands.command(name="tracker_cleanup")
+    @commands.is_owner()
+    async def cleanup(self, ctx):
+        deleted = await ctx.tracker.cleanup_channel()
+        await ctx.send(f"Deleted {deleted} old messages.")
+    
     @commands.Cog.listener()
     async def on_raw_reaction_add(self, payload):
         await self.on_raw_reaction(payload, added=True)
-
+    
     @commands.Cog.listener()
     async def on_raw_reaction_remove(self, payload):
         await self.on_raw_reaction(payload, added=False)
-        
-    @commands.Cog.listener()
+    
+    # Hands the reaction to its own server's tracker, each one has its own lock.
     async def on_raw_reaction(self, payload, added: bool):
         # Ignores bot's own reactions.
         if str(payload.user_id) == str(self.bot.user.id):
             return
+        tracker = self.tracker_for(payload.guild_id)
+        if tracker:
+            await tracker.on_raw_reaction(payload, added)
 
-        # Makes sure it's reacting to today's tracker message.
-        if payload.message_id not in getattr(self, "tracker_message_ids", None):
-            # print(f"message id not in list, id: {payload.message_id}")
-            return
-        
-        updated = False
-        day = ""
-        if len(self.tracker_message_ids) > 2:
-            if payload.message_id == self.tracker_message_ids[0]:
-                day = "two days ago's "
-            elif payload.message_id == self.tracker_message_ids[1]:
-                day = "yesterday's "
-            else:
-                day = "today's "
-        else:
-                day = "today's "
-        
-        emoji = payload.emoji.name
-        user_id = str(payload.user_id)
-        
-        async with self.data_lock:
-            meta = load_meta()
-            
-            print(f"payload.emoji.name = {payload.emoji.name}")
-            print(f"READING_EMOJI = {READING_EMOJI}")
-            print(f"WRITING_EMOJI = {WRITING_EMOJI}")
-
-            # Adds or removes user from current day.
-            if added:
-                if emoji == READING_EMOJI and user_id not in set(meta[day + "readers"]):
-                    meta[day + "readers"].append(user_id)
-                    updated = True
-                    print("sanity check")
-                    
-                elif emoji == WRITING_EMOJI and user_id not in set(meta[day + "writers"]):
-                    meta[day + "writers"].append(user_id)
-                    updated = True
-                    print("sanity check")
-                    
-            else:
-                if emoji == READING_EMOJI and user_id in set(meta[day + "readers"]):
-                    meta[day + "readers"].remove(user_id)
-                    updated = True
-                    print("sanity check")
-                    
-                elif emoji == WRITING_EMOJI and user_id in set(meta[day + "writers"]):
-                    meta[day + "writers"].remove(user_id)
-                    updated = True
-                    print("sanity check")
-            
-            save_meta(meta)
-        if updated:
-            
-            data = load_data()
-            data.setdefault(user_id, {"read": 0, "write": 0})
-            
-            leaderbard_copy = self.display_current_score(data, meta, day, past_day_display=False)
-                        
-            sorted_by_read = sorted(leaderbard_copy.items(), key=lambda item: item[1]['read'], reverse=True)
-            sorted_by_write = sorted(leaderbard_copy.items(), key=lambda item: item[1]['write'], reverse=True)
-
-            read_lines = [f"{self.reading_emoji} **Reading Streaks**"]
-            write_lines = [f"{self.writing_emoji } **Writing Streaks**"]
-            
-            # If one name is missing, all of them are missing.
-            if (user_id not in self.member_names):
-                print("Fetching missing member names")
-                for user_id in data:
-                    self.member_names[user_id] = await self.resolve_member_name(int(user_id))
-                
-            updated_leaderboard = self.make_leaderboard(
-                sorted_by_read, 
-                sorted_by_write, 
-                read_lines, 
-                write_lines
-            )
-            
-            # This code doesn't have a helper function becasue using 
-            # an async helper function was slightly slower
-            try:
-                message = self.channel.get_partial_message(self.leaderboard_message_id)
-                if not message:
-                    print("leaderboard partial message not found")
-                    message = await self.channel.fetch_message(self.leaderboard_message_id)
-                await message.edit(content=updated_leaderboard)
-            except Exception as e:
-                print(f"Couldn't edit leaderboard: {e}")
-            
-            # This currently updates every message to be the most recent day,
-            # currently removed because I had to post two messages in one day as a bugfix
-            #today = datetime.date.today()
-            
-            # Edits the current message.
-            if day == "today's ":
-                readers_text, writers_text = self.format_progress(
-                    leaderbard_copy, set(meta[day + "readers"]), set(meta[day + "writers"]), 
-                )
-                
-                new_content = (
-                    #f"Today is **{today.strftime('%A, %B %d, %Y')}.**\n"
-                    f"React with {self.reading_emoji} if you read today and {self.writing_emoji} if you wrote today.\n\n"
-                    f"**Today's readers:**\n{readers_text}\n\n"
-                    f"**Today's writers:**\n{writers_text}"
-                )
-                
-                try:
-                    message = self.channel.get_partial_message(payload.message_id)
-                    if not message:
-                        print("partial message not found")
-                        message = await self.channel.fetch_message(payload.message_id)
-                    await message.edit(content=new_content)
-                except Exception as e:
-                    print(f"Couldn't edit today's tracker message: {e}")
-            else:
-                # Retroactively alters current and any existing future days based on new info.
-                for index in range(len(meta["tracker_message_ids"])):
-                    
-                    readers_text, writers_text = self.format_progress(
-                        self.display_current_score(data, meta, DAYS[index], past_day_display=True), 
-                        set(meta[DAYS[index] + "readers"]), 
-                        set(meta[DAYS[index] + "writers"]),
-                    )
-                    
-                    new_content = (
-                        #f"Today is **{(today - timedelta(days = index)).strftime('%A, %B %d, %Y')}.**\n"
-                        f"React with {self.reading_emoji} if you read today and {self.writing_emoji} if you wrote today.\n\n"
-                        f"**Today's readers:**\n{readers_text}\n\n"
-                        f"**Today's writers:**\n{writers_text}"
-                    )
-                    
-                    try:
-                        message = self.channel.get_partial_message(meta["tracker_message_ids"][index])
-                        if not message:
-                            print("partial message not found")
-                            message = await self.channel.fetch_message(meta["tracker_message_ids"][index])
-                        await message.edit(content=new_content)
-                    except Exception as e:
-                        print(f"Couldn't edit past tracker message: {e}")
-    
 async def setup(bot):
-    await bot.add_cog(New_Tracker(bot))
\ No newline at end of file
+    await bot.add_cog(New_Tracker(bot))
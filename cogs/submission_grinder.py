@@ -7,79 +7,153 @@
 4.) for everything after the first post, update the post to include 
     new markets under its own section
 '''
-from discord.ext import commands, tasks
+from discord.ext import commands
 from zoneinfo import ZoneInfo
 from dotenv import load_dotenv
 load_dotenv()
-from bs4 import BeautifulSoup
 import discord
-import requests
+import aiohttp
 import json, os
 import asyncio
 import datetime
+import shlex
+from utils.market_fetcher import Market_Fetcher
+from utils.scheduler import SCHEDULER
+from utils.crawler import Market_Crawler
+from utils import market_parser
+from utils.market_index import Market_Index
+from utils.market_store import Market_Store, Market_Snapshot, make_records, html_hash, TEMP_CLOSED
+from utils.json_store import write_text_atomic, atomic_write_json, read_json
+from utils.message_packer import pack, pack_embeds, send_all, EMBED_DESCRIPTION_LIMIT
 
 NEW_MARKETS_MESSAGE_FILE = "data/new_markets_message.txt"
+CACHED_WEBSITE_FILE = "data/cached_website.html"
+FETCH_VALIDATORS_FILE = "data/fetch_validators.json"
+MARKET_STORE_FILE = "data/markets.json"
+MARKET_SNAPSHOT_FILE = "data/market_snapshot.json"
+CATALOGUE_FILE = "data/market_catalogue.json"
+CRAWL_STORE_FILE = "data/crawled_markets.json"
+CRAWL_CHECKPOINT_FILE = "data/crawl_checkpoint.json"
+CRAWL_VALIDATORS_FILE = "data/crawl_validators.json"
+CRAWL_CACHE_DIR = "data/crawl_cache"
+# Where the crawler starts and which listing pages it keeps following.
+CRAWL_SEEDS = os.getenv("GRINDER_CRAWL_SEEDS", "/Market/Search").split(",")
+CRAWL_FOLLOW = [r"/Market/Search", r"[?&]page=\d+"]
+CRAWL_WORKERS = int(os.getenv("GRINDER_CRAWL_WORKERS", 4))
+# Digest mode posts only what changed each day, plus one paginated
+# catalogue message that gets edited instead of reposting every market.
+DIGEST_MODE = os.getenv("GRINDER_DIGEST", "0") == "1"
 CHANNEL = "SUBMISSION_GRINDER_CHANNEL_ID"
+GRINDER_TIMEZONE = os.getenv("GRINDER_TIMEZONE", "America/Los_Angeles")
+# The fetch is spread over the last minute of the day so it doesn't
+# hit the site at exactly the same second every night.
+FETCH_SCHEDULE = "59 23 * * *"
+FETCH_JITTER = 45
+POST_SCHEDULE = "0 0 * * *"
 # CHANNEL = "CHANNEL_ID"
+SEARCH_FILTERS = ("genre", "length", "pay", "status")
+MAX_SEARCH_RESULTS = 25
 
-# Scrapes website.
-# DO NOT SPAM THIS.
-def fetch_website():
-    print("Scraping website.")
-    response = requests.get(os.getenv("URL"))
-    if not os.path.exists("data/cached_website.html"):
-        return {}
-    with open("data/cached_website.html", "w", encoding="utf-8") as f:
-        f.write(response.text)
-        
 # Reads html, currently used on html manually copied from source on 07-31-2025.
 def read_cached_html():
-    if not os.path.exists("data/cached_website.html"):
+    if not os.path.exists(CACHED_WEBSITE_FILE):
         return {}
-    with open("data/cached_website.html", "r", encoding="utf-8") as f:
+    with open(CACHED_WEBSITE_FILE, "r", encoding="utf-8") as f:
         return f.read()
     
+# The actual parsing lives in utils/market_parser.py, which picks lxml
+# when it's installed and falls back to BeautifulSoup otherwise.
 def parse_recently_added(html):
-    soup = BeautifulSoup(html, "html.parser")
+    entries = market_parser.parse_recently_added(html, os.getenv("URL", ""))
+    print("HTML parsed.")
+    return entries
 
-    section = soup.find("div", id="divRecentlyAddedMarketsTabArea")
-    if not section:
-        print("Could not find Recently Added Markets section")
-        return []
+def display_name(record: dict) -> str:
+    return record["name"] + TEMP_CLOSED if record["temp_closed"] else record["name"]
 
-    entries = []
-    rows = section.find_all("div", class_=lambda x: x and x.startswith("MarketSearchListingRow"))
+# Format markets for Discord
+def format_market(record: dict, prefix: str = "-# - ") -> str:
+    name = display_name(record)
+    genres = ", ".join(record["genres"]) if record["genres"] else "Unspecified"
+    lengths = ", ".join(record["lengths"]) if record["lengths"] else "Unspecified"
+    return f"{prefix}[**{name}**]({record['link']}) — Genres: *{genres}*, Lengths: *{lengths}*, Pay: *{record['pay']}*"
 
-    for row in rows:
-        name_tag = row.find("div", class_=lambda x: x and "Name" in x)
-        name = name_tag.get_text(strip=True) if name_tag else "Unnamed"
-        link_tag = name_tag.find("a") if name_tag else None
-        link = os.getenv("URL") + link_tag["href"] if link_tag else ""
+# Non-paying markets first, then paying, each sorted like the old text lines were.
+# The title shares a header with the first group so they never get split apart.
+def sections_by_pay(title: str, records: list) -> list:
+    non_paying = sorted(format_market(record) for record in records if "Non-Paying" in record["pay"])
+    paying = sorted(format_market(record) for record in records if "Non-Paying" not in record["pay"])
+    return [(title + "\n\nNon-Paying:\n", non_paying), ("\nPaying:\n", paying)]
 
-        genres = row.find("div", class_=lambda x: x and "Genre" in x)
-        genre_list = []
-        if genres:
-            icons = genres.find_all("img")
-            genre_list = [icon.get("alt") for icon in icons if icon.get("alt")]
+def render_expired(removed: list) -> tuple:
+    names = sorted(display_name(record) for record in removed)
+    return ("**Expired markets:**", [", ".join(names) + "."])
 
-        lengths = row.find("div", class_=lambda x: x and "Length" in x)
-        length_list = []
-        if lengths:
-            icons = lengths.find_all("img")
-            length_list = [icon.get("alt") for icon in icons if icon.get("alt")]
+# Returns (header, lines) sections for the message packer.
+def render_catalogue(markets: dict, changes: dict) -> list:
+    added = {record["id"] for record in changes["added"]}
+    listed = [record for market, record in markets.items() if market not in added]
+    
+    sections = sections_by_pay("\n\n**Temporarily Closed Markets:**\n", [record for record in listed if record["temp_closed"]])
+    sections += sections_by_pay("\n\n**Current Markets:**\n", [record for record in listed if not record["temp_closed"]])
+    
+    if not changes["added"]:
+        sections.append(("\n**Just Added Today:**", ["None."]))
+    else:
+        sections += sections_by_pay("\n**Just Added Today:**", changes["added"])
+        
+    if changes["reopened"]:
+        sections.append(("\n**Reopened Today:**", sorted(format_market(record) for record in changes["reopened"])))
+    return sections
 
-        pay_tag = row.find("span")
-        pay = pay_tag.get_text(strip=True) if pay_tag else "Unspecified"
+# One embed per kind of change, with no embeds at all on a quiet day.
+def digest_embeds(changes: dict) -> list:
+    embeds = []
+    kinds = [
+        ("Just Added", changes["added"], discord.Color.green()),
+        ("Reopened", changes["reopened"], discord.Color.blue()),
+    ]
+    for title, records, color in kinds:
+        lines = sorted(format_market(record, prefix="- ") for record in records)
+        for page in pack(lines, limit=EMBED_DESCRIPTION_LIMIT):
+            embeds.append(discord.Embed(title=title, description=page, color=color))
+            
+    if changes["removed"]:
+        names = ", ".join(sorted(display_name(record) for record in changes["removed"])) + "."
+        for page in pack([names], limit=EMBED_DESCRIPTION_LIMIT):
+            embeds.append(discord.Embed(title="Expired", description=page, color=discord.Color.red()))
+    return embeds
 
-        entries.append({
-            "name": name,
-            "link": link,
-            "genres": genre_list,
-            "lengths": length_list,
-            "pay": pay
-        })
-    print("HTML parsed.")
-    return entries
+def catalogue_pages(markets: dict) -> list:
+    records = list(markets.values())
+    sections = sections_by_pay("**Temporarily Closed Markets:**", [record for record in records if record["temp_closed"]])
+    sections += sections_by_pay("\n**Current Markets:**", [record for record in records if not record["temp_closed"]])
+    return list(pack(sections, limit=EMBED_DESCRIPTION_LIMIT)) or ["No markets yet."]
+
+# The page being shown lives in the footer, so the buttons
+# keep working after a restart without remembering anything.
+def shown_page(message) -> int:
+    if not message or not message.embeds or not message.embeds[0].footer.text:
+        return 0
+    return int(message.embeds[0].footer.text.split()[1]) - 1
+
+class Catalogue_View(discord.ui.View):
+    def __init__(self, cog):
+        super().__init__(timeout=None)
+        self.cog = cog
+        
+    @discord.ui.button(label="◀", style=discord.ButtonStyle.secondary, custom_id="grinder_catalogue:previous")
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.turn_page(interaction, -1)
+        
+    @discord.ui.button(label="▶", style=discord.ButtonStyle.secondary, custom_id="grinder_catalogue:next")
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.turn_page(interaction, 1)
+        
+    async def turn_page(self, interaction: discord.Interaction, step: int):
+        pages = self.cog.catalogue_pages()
+        page = (shown_page(interaction.message) + step) % len(pages)
+        await interaction.response.edit_message(embed=self.cog.catalogue_embed(page), view=self)
 
 class Submission_Grinder(commands.Cog):
     def __init__(self, bot):
@@ -87,181 +161,213 @@ class Submission_Grinder(commands.Cog):
         # currently bot-spam for testing
         self.channel = None
         self.html =  None
-        self.send_daily_grinder_update.start()
-        self.daily_fetch_website.start()
+        self.fetcher = Market_Fetcher(FETCH_VALIDATORS_FILE)
+        self.market_store = Market_Store(MARKET_STORE_FILE)
+        self.snapshot = Market_Snapshot(MARKET_SNAPSHOT_FILE)
+        self.catalogue_view = Catalogue_View(self)
+        self.pages = None
+        self.index = None
+        self.index_source = None
+        self.crawl_task = None
+        self.crawler = None
+        # Every market the crawler has found, including ones long gone from the recently added tab.
+        self.crawl_store = Market_Store(CRAWL_STORE_FILE)
+        # Goes up after every crawl, so the index knows the crawled markets changed.
+        self.crawl_version = 0
+        
+    async def cog_load(self):
+        await self.fetcher.open()
+        self.snapshot.load()
+        self.crawl_store.load()
+        # Same group, so after downtime the missed fetch still runs before the missed post.
+        SCHEDULER.add_job("grinder:fetch", FETCH_SCHEDULE, self.daily_fetch_website,
+                          tz=GRINDER_TIMEZONE, jitter=FETCH_JITTER, group="grinder")
+        SCHEDULER.add_job("grinder:post", POST_SCHEDULE, self.send_daily_grinder_update,
+                          tz=GRINDER_TIMEZONE, group="grinder")
+        # The first time around, the last posted message is
+        # the only record of which markets were already there.
+        if self.market_store.load() is None and os.path.exists(NEW_MARKETS_MESSAGE_FILE):
+            with open(NEW_MARKETS_MESSAGE_FILE, "r") as f:
+                self.market_store.seed_from_lines(f.read().splitlines())
+        # Registered up front so buttons on an already posted catalogue still work.
+        self.bot.add_view(self.catalogue_view)
+        
+    async def cog_unload(self):
+        SCHEDULER.remove_job("grinder:fetch")
+        SCHEDULER.remove_job("grinder:post")
+        if self.crawl_task:
+            self.crawl_task.cancel()
+        await self.fetcher.close()
+        
+    # Scrapes website, returns whether the page changed since the last fetch.
+    # DO NOT SPAM THIS.
+    async def fetch_website(self) -> bool:
+        print("Scraping website.")
+        try:
+            changed, html = await self.fetcher.fetch(os.getenv("URL"), CACHED_WEBSITE_FILE)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"Couldn't scrape website: {e}")
+            return False
+        if changed:
+            self.html = html
+        return changed
+    
+    # Parses a page only if it isn't the one already parsed,
+    # without html it just hands back the last parsed markets.
+    async def load_markets(self, html: str = None) -> dict:
+        if html is None:
+            if self.snapshot.markets is not None:
+                return self.snapshot.markets
+            html = await asyncio.to_thread(read_cached_html)
+            if not html:
+                return {}
+            
+        digest = html_hash(html)
+        if digest == self.snapshot.html_hash:
+            print("Markets already parsed for this page.")
+            return self.snapshot.markets
+        
+        markets = make_records(parse_recently_added(html))
+        if markets:
+            self.snapshot.replace(digest, markets)
+            await asyncio.to_thread(self.snapshot.save)
+        return markets
         
     # Runs every 24 hours to not scrape the website too often.
-    @tasks.loop(time=datetime.time(hour=23, minute=59, tzinfo=ZoneInfo("America/Los_Angeles")))
-    async def daily_fetch_website(self):
-        fetch_website()
-        # The next two lines are probably redundant.
-        self.html = read_cached_html()
-        new_markets = parse_recently_added(self.html)
+    async def daily_fetch_website(self, scheduled: datetime.datetime):
+        await self.bot.wait_until_ready()
+        # Nothing to parse if the page hasn't changed since yesterday.
+        if not await self.fetch_website():
+            return
+        new_markets = await self.load_markets(self.html)
         if not new_markets:
             print("Failed to load new markets.")
             return
         else:
             print("New markets loaded.")
         
-    @tasks.loop(time=datetime.time(hour=0, minute=0, tzinfo=ZoneInfo("America/Los_Angeles")))
-    async def send_daily_grinder_update(self):
-        await self.daily_grinder_update()
-    
-    @daily_fetch_website.before_loop
-    async def before_daily_fetch_website(self):
+    async def send_daily_grinder_update(self, scheduled: datetime.datetime):
         await self.bot.wait_until_ready()
+        await self.daily_grinder_update()
     
     async def daily_grinder_update(self):
-        PST = ZoneInfo("America/Los_Angeles")
-        now = datetime.datetime.now(PST)
+        now = datetime.datetime.now(ZoneInfo(GRINDER_TIMEZONE))
         print(f"daily grinder update posted at {now.strftime('%Y-%m%d %H:%M%S %Z')}")
         
-        new_markets = parse_recently_added(read_cached_html())
-        
-        # Format markets for Discord
-        formatted = []
-        for market in new_markets:
-            name = market["name"]
-            link = market["link"]
-            genres = ", ".join(market["genres"]) if market["genres"] else "Unspecified"
-            lengths = ", ".join(market["lengths"]) if market["lengths"] else "Unspecified"
-            pay = market["pay"]
-
-            line = f"[**{name}**]({link}) — Genres: *{genres}*, Lengths: *{lengths}*, Pay: *{pay}*"
-            formatted.append(line)
-           
-        content = ("\n".join(f"-# - {line}" for line in formatted))
-        content = content.splitlines()
+        markets = await self.load_markets()
         
         self.channel = self.bot.get_channel(int(os.getenv(CHANNEL)))
         if not self.channel:
             print("ERROR: scraper get_channel doesn't work.")
             return
         
-        print("attempting to open file")
-        if os.path.exists(NEW_MARKETS_MESSAGE_FILE):
-            with open(NEW_MARKETS_MESSAGE_FILE, "r+") as f:
-                data = f.read()
-                f.seek(0)
-                lines = data.splitlines()
-                
-                # Writes to file if empty.
-                file_was_empty = False
-                if not lines:
-                    file_was_empty = True
-                    print("Message file empty, now writing to file.")
-                    for message in content:
-                        f.write(message)
-                    f.seek(0)
-                    lines = f.read().splitlines()
-                else:
-                    print("Message file not empty.")
-                    
-                expired_markets = []
-                closed_markets = ["\n\n**Temporarily Closed Markets:**\n"]
-                open_markets = ["\n\n**Current Markets:**\n"]
-                non_paying = [["\nNon-Paying:\n"], ["\nNon_Paying:\n"]]
-                paying = [["\nPaying:\n"], ["\nPaying:\n"]]
-                # removes expired markets and appends their names to a string
-                for line in lines:
-                    if line not in content:
-                        if "[**" in line:
-                            expired_markets.append(line.split("**", 1)[1].split("**")[0])
-                    else:
-                        if "Temp Closed" in line:
-                            if "Non-Paying" in line:
-                                non_paying[0].append(line)
-                            else:
-                                paying[0].append(line)
-                        else:
-                            if "Non-Paying" in line:
-                                non_paying[1].append(line)
-                            else:
-                                paying[1].append(line)
-                print("passed loop")
-                expired_markets.sort()
-                non_paying[0].sort()
-                paying[0].sort()
-                non_paying[1].sort()
-                paying[1].sort()
-                closed_markets = closed_markets + non_paying[0] + paying[0]
-                open_markets = open_markets + non_paying[1] + paying[1]
-
-                lines = closed_markets + open_markets
-
-                if not expired_markets:
-                    print("No expired markets.")
-                else:
-                    ''' 
-                    This doesn't cover for if there are so many expired markets 
-                    that it requires more than one discord message to send, 
-                    but that many markets expiring at the same time 
-                    with the website this code scrapes from is impossible 
-                    unless the code isn't working as intended.
-                    '''
-                    print("Updating expired markets")
-
-                    await self.channel.send("**Expired markets:**\n" + ", ".join(expired_markets) + ".")
-                
-                just_added = ["\n**Just Added Today:**"]
-                non_paying = ["\nNon-Paying:\n"]
-                paying = ["\nPaying:\n"]
-                any_new_markets = False
-                
-                for message in content:
-                    if message not in lines:
-                        print("just added: " + message)
-                        any_new_markets = True
-                        if "Non-Paying" in message:
-                            non_paying.append(message)
-                        else:
-                            paying.append(message)
-            
-                if not any_new_markets: 
-                    just_added.append("None.")
-                else:
-                    non_paying.sort()
-                    paying.sort()
-                    just_added = just_added + non_paying + paying
-
-                lines = lines + just_added
-
-                if not file_was_empty:
-                    f.truncate()
-                    print("Writing new content to file.")
-                    for line in lines:
-                        f.write(line + "\n")
-        else:
-            print("ERROR: message file not found.")
+        changes = self.market_store.update(markets)
+        print(
+            f"{len(changes['added'])} added, {len(changes['removed'])} expired, "
+            f"{len(changes['reopened'])} reopened, {len(changes['changed'])} changed."
+        )
+        
+        if DIGEST_MODE:
+            await self.post_digest(changes)
+            await asyncio.to_thread(self.market_store.save)
             return
-        print("Attempting to print content.")
-        content = lines
-        charcount = "".join(content)
-                        
-        if len(charcount) > 2000:
-            print(f"⚠️ Message is too long ({len(content)} characters). Splitting...")
-            # Split into chunks
-            chunks = []
-            chunk = ""
-            for line in content:
-                if len(chunk) + len(line) + 1 > 2000:
-                    chunks.append(chunk)
-                    chunk = line
-                else:
-                    chunk += "\n" + line if chunk else line
-            if chunk:
-                chunks.append(chunk)
-
-            for c in chunks:
-                print(f"printing chunk character size {len(c)}")
-                await self.channel.send(c)
+        
+        if not changes["removed"]:
+            print("No expired markets.")
         else:
-            await self.channel.send(charcount)
+            print("Updating expired markets")
+            await send_all(self.channel, pack([render_expired(changes["removed"])]))
             
+        sections = render_catalogue(markets, changes)
+        
+        print("Writing new content to file.")
+        lines = [line for header, items in sections for line in (header, *items)]
+        await asyncio.to_thread(self.market_store.save)
+        await asyncio.to_thread(write_text_atomic, NEW_MARKETS_MESSAGE_FILE, "".join(line + "\n" for line in lines))
+        
+        print("Attempting to print content.")
+        await send_all(self.channel, pack(sections))
          
-    @send_daily_grinder_update.before_loop
-    async def before_daily_grinder_update(self):
-        await self.bot.wait_until_ready()
+    # Crawled markets fill in everything the recently added page doesn't show,
+    # markets from the page itself win since they're the freshest.
+    def with_crawled(self, markets: dict) -> dict:
+        return {**(self.crawl_store.markets or {}), **markets}
+    
+    def catalogue_pages(self) -> list:
+        if self.pages is None:
+            self.pages = catalogue_pages(self.with_crawled(self.market_store.markets or {}))
+        return self.pages
+    
+    def catalogue_embed(self, page: int) -> discord.Embed:
+        pages = self.catalogue_pages()
+        embed = discord.Embed(title="Submission Grinder Markets", description=pages[page])
+        embed.set_footer(text=f"Page {page + 1} of {len(pages)}")
+        return embed
+    
+    async def post_digest(self, changes: dict):
+        embeds = digest_embeds(changes)
+        if not embeds:
+            print("No market changes today.")
+        await send_all(self.channel, [{"embeds": group} for group in pack_embeds(embeds)])
+        
+        self.pages = None
+        await self.update_catalogue()
+        
+    # Edits the catalogue message in place, only posting a new one if it's gone.
+    async def update_catalogue(self):
+        catalogue = read_json(CATALOGUE_FILE)
+        embed = self.catalogue_embed(0)
+        if catalogue.get("message_id"):
+            try:
+                message = self.channel.get_partial_message(catalogue["message_id"])
+                await message.edit(embed=embed, view=self.catalogue_view)
+                return
+            except discord.NotFound:
+                print("Catalogue message is gone, posting a new one.")
+                
+        message, = await send_all(self.channel, [{"embed": embed, "view": self.catalogue_view}])
+        await asyncio.to_thread(atomic_write_json, CATALOGUE_FILE, {"message_id": message.id})
+        
+    # Rebuilt only when there's a new snapshot or a finished crawl to search.
+    def market_index(self) -> Market_Index:
+        markets = self.snapshot.markets if self.snapshot.markets is not None else (self.market_store.markets or {})
+        if self.index is None or self.index_source[0] is not markets or self.index_source[1] != self.crawl_version:
+            self.index = Market_Index(self.with_crawled(markets))
+            self.index_source = (markets, self.crawl_version)
+        return self.index
+    
+    # /markets genre:fantasy length:flash pay:paying status:open some name
+    @commands.command(name="markets")
+    async def search_markets(self, ctx, *, query: str = ""):
+        if not query:
+            await ctx.send(
+                "Usage: `/markets genre:<genre> length:<length> pay:<pro|semi-pro|token|paying|non-paying|fees|unknown> "
+                "status:<open|temp-closed> name words`, every part is optional."
+            )
+            return
+        
+        filters = {}
+        words = []
+        try:
+            tokens = shlex.split(query)
+        except ValueError:
+            tokens = query.split()
+        for token in tokens:
+            key, separator, value = token.partition(":")
+            if separator and key.lower() in SEARCH_FILTERS:
+                filters[key.lower()] = value
+            else:
+                words.append(token)
+                
+        results = self.market_index().search(text=" ".join(words), **filters)
+        if not results:
+            await ctx.send("No markets match that.")
+            return
+        
+        lines = [format_market(record, prefix="- ") for record in results[:MAX_SEARCH_RESULTS]]
+        if len(results) > MAX_SEARCH_RESULTS:
+            lines.append(f"...and {len(results) - MAX_SEARCH_RESULTS} more, try narrowing it down.")
+        await send_all(ctx.channel, pack([(f"**{len(results)} markets found:**", lines)]))
         
     @commands.command(name="force_submission_grinder_update")
     @commands.is_owner()
@@ -273,7 +379,50 @@ class Submission_Grinder(commands.Cog):
     @commands.is_owner()
     async def test_load(self, ctx):
         await ctx.send("Loading new markets...")
-        fetch_website()
+        # Parsed straight into the snapshot, so the next post uses what was just fetched.
+        if not await self.fetch_website():
+            await ctx.send("The page hasn't changed since the last fetch.")
+            return
+        markets = await self.load_markets(self.html)
+        await ctx.send(f"Loaded {len(markets)} markets.")
+        
+    # Walks the whole market catalogue rather than just the recently added tab.
+    # Slow on purpose, it runs in the background and can be resumed.
+    async def crawl_markets(self, resume: bool = True) -> dict:
+        fetcher = Market_Fetcher(CRAWL_VALIDATORS_FILE, connections=CRAWL_WORKERS, autosave=False)
+        self.crawler = Market_Crawler(os.getenv("URL"), fetcher, self.crawl_store, CRAWL_CHECKPOINT_FILE,
+                                      CRAWL_CACHE_DIR, CRAWL_SEEDS, CRAWL_FOLLOW, workers=CRAWL_WORKERS)
+        os.makedirs(CRAWL_CACHE_DIR, exist_ok=True)
+        try:
+            return await self.crawler.run(resume)
+        finally:
+            await fetcher.close()
+            # /markets and the catalogue pick up whatever got crawled.
+            self.crawl_version += 1
+            self.pages = None
+            
+    @commands.command(name="crawl_markets")
+    @commands.is_owner()
+    async def start_crawl(self, ctx, fresh: str = ""):
+        if self.crawl_task and not self.crawl_task.done():
+            await ctx.send("A crawl is already running.")
+            return
+        
+        async def crawl():
+            stats = await self.crawl_markets(resume=fresh != "fresh")
+            await ctx.send(f"Crawl finished: {stats}")
+        self.crawl_task = asyncio.create_task(crawl())
+        await ctx.send("Crawling the market catalogue in the background.")
+        
+    @commands.command(name="crawl_status")
+    @commands.is_owner()
+    async def crawl_status(self, ctx):
+        if not self.crawler:
+            await ctx.send("No crawl has run since the bot started.")
+            return
+        state = "running" if self.crawl_task and not self.crawl_task.done() else "finished"
+        await ctx.send(f"Crawl {state}: {len(self.crawler.done)} pages done, "
+                       f"{len(self.crawler.seen) - len(self.crawler.done)} pending, {self.crawler.stats}")
         
 async def setup(bot):
     await bot.add_cog(Submission_Grinder(bot))
\ No newline at end of file
@@ -0,0 +1,241 @@
+import asyncio
+import hashlib
+import os
+import re
+import time
+from urllib import robotparser
+from urllib.parse import urljoin, urlparse
+import aiohttp
+from bs4 import BeautifulSoup
+from utils.json_store import atomic_write_json, read_json
+from utils.market_store import make_record, market_id, MARKET_ID
+
+LINK = re.compile(r'href="([^"#]+)"')
+PAY = re.compile(r"\d+(?:\.\d+)?\s*¢/word|\$\d+(?:\.\d+)?(?:/\w+)?|Non-Paying|\(fees\)")
+# Everything else the grinder shows as an icon on a market page is a genre.
+LENGTHS = {
+    "Flash", "Short Story", "Novelette", "Novella", "Novel", "Novel Excerpt",
+    "Story Collection", "Poetry", "Nonfiction", "Anthology",
+}
+CHECKPOINT_EVERY = 25
+
+# Detail pages don't have the listing's row layout, so this only relies on
+# the page heading, the icon alt text and whatever looks like a pay rate.
+def parse_market_page(html: str, url: str) -> dict:
+    soup = BeautifulSoup(html, "html.parser")
+    heading = soup.find("h1") or soup.find("title")
+    name = heading.get_text(" ", strip=True) if heading else "Unnamed"
+    name = name.split(" - The Submission Grinder")[0]
+    
+    icons = [img.get("alt") for img in soup.find_all("img", class_=lambda x: x and "Icon" in x) if img.get("alt")]
+    text = soup.get_text(" ", strip=True)
+    pay = PAY.search(text)
+    closed = "- Temp Closed -" if "Temp Closed" in text else ""
+    return make_record({
+        "name": name + closed,
+        "link": url,
+        "genres": [icon for icon in icons if icon not in LENGTHS],
+        "lengths": [icon for icon in icons if icon in LENGTHS],
+        "pay": pay.group() if pay else "Unspecified",
+    })
+
+# Spaces out requests to the same host by at least `delay` seconds,
+# no matter how many workers are waiting on it.
+class Host_Limiter:
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.next_allowed = {}
+        self.locks = {}
+        
+    async def wait(self, url: str):
+        host = urlparse(url).netloc
+        async with self.locks.setdefault(host, asyncio.Lock()):
+            wait = self.next_allowed.get(host, 0) - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self.next_allowed[host] = time.monotonic() + self.delay
+
+# Walks listing pages and every /Market/Index/<id> page they link to with
+# a small pool of workers, saving where it got to so it can pick up again.
+class Market_Crawler:
+    def __init__(self, base_url: str, fetcher, store, checkpoint_path: str, cache_dir: str,
+                 seeds: list, follow: list = (), workers: int = 4, delay: float = 1.0):
+        self.base_url = base_url
+        self.fetcher = fetcher
+        self.store = store
+        self.checkpoint_path = checkpoint_path
+        self.cache_dir = cache_dir
+        self.seeds = [urljoin(base_url, seed) for seed in seeds]
+        # Links matching these are listing pages, only crawled for more links.
+        self.follow = [re.compile(pattern) for pattern in follow]
+        self.workers = workers
+        self.delay = delay
+        self.robots = None
+        self.queue = None
+        self.seen = set()
+        self.done = set()
+        self.stats = {"fetched": 0, "unchanged": 0, "failed": 0, "disallowed": 0}
+        
+    async def load_robots(self):
+        self.robots = robotparser.RobotFileParser()
+        try:
+            async with self.fetcher.session.get(urljoin(self.base_url, "/robots.txt")) as response:
+                lines = (await response.text()).splitlines() if response.status == 200 else []
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            lines = []
+        self.robots.parse(lines)
+        # Checked for the same User-Agent the fetcher sends.
+        crawl_delay = self.robots.crawl_delay(self.fetcher.user_agent)
+        if crawl_delay:
+            self.delay = max(self.delay, float(crawl_delay))
+            
+    def enqueue(self, url: str):
+        if url not in self.seen:
+            self.seen.add(url)
+            self.queue.put_nowait(url)
+            
+    def is_market(self, url: str) -> bool:
+        return MARKET_ID.search(urlparse(url).path) is not None
+    
+    def is_listing(self, url: str) -> bool:
+        return url in self.seeds or any(pattern.search(url) for pattern in self.follow)
+            
+    async def run(self, resume: bool = True) -> dict:
+        await self.fetcher.open()
+        await self.load_robots()
+        self.limiter = Host_Limiter(self.delay)
+        if self.store.load() is None:
+            self.store.markets = {}
+            
+        self.queue = asyncio.Queue()
+        checkpoint = read_json(self.checkpoint_path) if resume else {}
+        self.done = set(checkpoint.get("done", []))
+        self.seen = set(self.done)
+        for url in checkpoint.get("pending") or self.seeds:
+            self.enqueue(url)
+            
+        workers = [asyncio.create_task(self.worker()) for _ in range(self.workers)]
+        try:
+            await self.queue.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await self.save_checkpoint()
+            
+        # Finished with nothing failed, so the next crawl starts over from the seeds.
+        # Otherwise the checkpoint keeps the failed pages and resuming retries just those.
+        if self.queue.empty() and self.seen <= self.done:
+            await asyncio.to_thread(atomic_write_json, self.checkpoint_path, {})
+        return self.stats
+    
+    async def worker(self):
+        while True:
+            url = await self.queue.get()
+            try:
+                await self.visit(url)
+                self.done.add(url)
+            # Anything a page throws only fails that page, a dead worker
+            # would leave queue.join() in run waiting forever.
+            # It stays out of done, so it's still pending for the next resumed crawl.
+            except Exception as e:
+                self.stats["failed"] += 1
+                print(f"Couldn't crawl {url}: {e!r}")
+            finally:
+                self.queue.task_done()
+            if len(self.done) % CHECKPOINT_EVERY == 0:
+                await self.save_checkpoint()
+                
+    async def visit(self, url: str):
+        if not self.robots.can_fetch(self.fetcher.user_agent, url):
+            self.stats["disallowed"] += 1
+            return
+        await self.limiter.wait(url)
+        
+        if self.is_market(url):
+            # The stored record stands in for the page, so a 304 needs nothing else,
+            # unless the record has gone missing and the page has to be fetched in full.
+            if market_id(url, None) not in self.store.markets:
+                self.fetcher.validators.pop(url, None)
+            changed, html = await self.fetcher.fetch(url)
+            if not changed:
+                self.stats["unchanged"] += 1
+                return
+            record = parse_market_page(html, url)
+            self.store.markets[record["id"]] = record
+        else:
+            # Listing pages get cached so their links can be read again after a 304.
+            cache_path = os.path.join(self.cache_dir, hashlib.sha1(url.encode()).hexdigest() + ".html")
+            changed, html = await self.fetcher.fetch(url, cache_path)
+            if not changed:
+                self.stats["unchanged"] += 1
+                with open(cache_path, "r", encoding="utf-8") as f:
+                    html = f.read()
+                    
+        self.stats["fetched"] += changed
+        for link in LINK.findall(html):
+            link = urljoin(url, link)
+            if urlparse(link).netloc != urlparse(self.base_url).netloc:
+                continue
+            if self.is_market(link) or self.is_listing(link):
+                self.enqueue(link)
+                
+    async def save_checkpoint(self):
+        pending = [url for url in self.seen if url not in self.done]
+        await asyncio.to_thread(atomic_write_json, self.checkpoint_path, {"done": sorted(self.done), "pending": pending})
+        await asyncio.to_thread(self.store.save)
+        await self.fetcher.save_validators()
+
+# Crawls the saved pages in data/crawl_fixture from a local server, twice.
+# The second crawl should get nothing but 304s back, and resuming after it
+# should only retry the one broken page.
+# Run from the repo root with: python -m utils.crawler
+if __name__ == "__main__":
+    import tempfile
+    from aiohttp import web
+    from utils.market_fetcher import Market_Fetcher, USER_AGENT
+    from utils.market_store import Market_Store
+    
+    FIXTURE_DIR = "data/crawl_fixture"
+    ROUTES = {"/robots.txt": "robots.txt", "/Market/Search": "search.html", "/Market/Search?page=2": "search_page2.html"}
+    
+    async def serve(request):
+        if request.headers.get("User-Agent") != USER_AGENT:
+            return web.Response(status=403, text="Wrong User-Agent")
+        name = ROUTES.get(request.path_qs)
+        match = MARKET_ID.fullmatch(request.path)
+        if match:
+            name = f"market_{match.group(1)}.html"
+        if not name or not os.path.exists(os.path.join(FIXTURE_DIR, name)):
+            return web.Response(status=404)
+        with open(os.path.join(FIXTURE_DIR, name), "rb") as f:
+            body = f.read()
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+        content_type = "text/plain" if name.endswith(".txt") else "text/html"
+        return web.Response(body=body, headers={"ETag": etag, "Content-Type": f"{content_type}; charset=utf-8"})
+    
+    async def main():
+        app = web.Application()
+        app.router.add_get("/{path:.*}", serve)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", 0).start()
+        port = runner.addresses[0][1]
+        
+        with tempfile.TemporaryDirectory() as folder:
+            for run, resume in ((1, False), (2, False), ("resumed", True)):
+                fetcher = Market_Fetcher(os.path.join(folder, "validators.json"), autosave=False)
+                store = Market_Store(os.path.join(folder, "markets.json"))
+                crawler = Market_Crawler(f"http://127.0.0.1:{port}", fetcher, store, os.path.join(folder, "checkpoint.json"),
+                                         folder, ["/Market/Search"], [r"[?&]page=\d+"], delay=0)
+                start = time.monotonic()
+                stats = await crawler.run(resume=resume)
+                await fetcher.close()
+                print(f"crawl {run}: {stats} in {time.monotonic() - start:.2f}s")
+            for record in sorted(store.markets.values(), key=lambda record: record["id"]):
+                print(f"  {record['id']}: {record['name']}, {record['genres']}, {record['lengths']}, "
+                      f"{record['pay']}, temp closed: {record['temp_closed']}")
+        await runner.cleanup()
+        
+    asyncio.run(main())
@@ -0,0 +1,162 @@
+import datetime
+from collections import deque
+
+CATEGORIES = ("readers", "writers")
+# How meta kept the window before its length could be set,
+# bucket name prefix -> days before last_updated_date.
+LEGACY_DAY_OFFSETS = {"today's ": 0, "yesterday's ": 1, "two days ago's ": 2}
+
+# One day of the window: its date, the tracker message posted for it, and who reacted.
+# Days the bot missed still get a slot, just without a message.
+# A scored slot is padding for a day that's already counted in the stored scores,
+# from a window that just got longer, so scoring skips it.
+class Day_Slot:
+    def __init__(self, serial: int, date: str, message_id: int = None, readers=(), writers=(), scored: bool = False):
+        # Counts up by one per day, so a slot's position is a subtraction away.
+        self.serial = serial
+        self.date = date
+        self.message_id = message_id
+        self.members = {"readers": set(readers), "writers": set(writers)}
+        self.scored = scored
+    
+    def to_json(self) -> dict:
+        day = {
+            "date": self.date,
+            "message_id": self.message_id,
+            "readers": sorted(self.members["readers"]),
+            "writers": sorted(self.members["writers"]),
+        }
+        if self.scored:
+            day["scored"] = True
+        return day
+
+# The last `size` days, oldest first. Rolling over appends a day and the
+# deque drops the oldest, and a reaction finds its day through by_message,
+# so neither gets slower with a longer window.
+class Day_Window:
+    def __init__(self, size: int):
+        self.size = size
+        self.slots = deque(maxlen=size)
+        self.by_message = {}
+    
+    def __len__(self) -> int:
+        return len(self.slots)
+    
+    def __iter__(self):
+        return iter(self.slots)
+    
+    def __getitem__(self, position: int) -> Day_Slot:
+        return self.slots[position]
+    
+    @property
+    def today(self) -> Day_Slot:
+        return self.slots[-1]
+    
+    def position(self, slot: Day_Slot) -> int:
+        return slot.serial - self.slots[0].serial
+    
+    def slot_for(self, message_id: int):
+        return self.by_message.get(message_id)
+    
+    def message_ids(self) -> list:
+        return [slot.message_id for slot in self.slots if slot.message_id]
+    
+    def members(self) -> set:
+        users = set()
+        for slot in self.slots:
+            for members in slot.members.values():
+                users |= members
+        return users
+    
+    # The last day the stored scores include, everything after it still gets projected.
+    def scored_through(self) -> str:
+        for slot in self.slots:
+            if not slot.scored:
+                return (datetime.date.fromisoformat(slot.date) - datetime.timedelta(days=1)).isoformat()
+        return self.slots[-1].date
+    
+    def append(self, date: str, message_id: int = None, readers=(), writers=(), scored: bool = False) -> Day_Slot:
+        if len(self.slots) == self.size:
+            self.by_message.pop(self.slots[0].message_id, None)
+        serial = self.slots[-1].serial + 1 if self.slots else 0
+        slot = Day_Slot(serial, date, message_id, readers, writers, scored)
+        self.slots.append(slot)
+        if message_id:
+            self.by_message[message_id] = slot
+        return slot
+    
+    # Moves the window on to date, with message_id as its new today.
+    # Days skipped on the way get empty slots, and only the last
+    # `size` of them are ever made since the rest would fall off anyway.
+    def advance(self, date: str, periods: int, message_id: int) -> Day_Slot:
+        newest = datetime.date.fromisoformat(date)
+        for offset in range(min(periods, self.size) - 1, 0, -1):
+            self.append((newest - datetime.timedelta(days=offset)).isoformat())
+        return self.append(date, message_id)
+    
+    # Pads the front with empty days so the window is always full,
+    # for a fresh tracker or one whose window just got longer.
+    # Those days are already in the stored scores, so they're marked scored.
+    def fill(self, newest: str):
+        if not self.slots:
+            self.append(newest)
+        while len(self.slots) < self.size:
+            oldest = self.slots[0]
+            date = (datetime.date.fromisoformat(oldest.date) - datetime.timedelta(days=1)).isoformat()
+            self.slots.appendleft(Day_Slot(oldest.serial - 1, date, scored=True))
+    
+    # Returns the days that didn't fit, oldest first, when the window got shorter.
+    # They haven't been scored yet, so the caller has to score them before they're gone.
+    def load(self, days: list) -> list:
+        dropped = []
+        for day in days:
+            if len(self.slots) == self.size and not self.slots[0].scored:
+                dropped.append(self.slots[0])
+            self.append(day["date"], day.get("message_id"), day.get("readers", []), day.get("writers", []),
+                        day.get("scored", False))
+        return dropped
+    
+    def to_json(self) -> list:
+        return [slot.to_json() for slot in self.slots]
+
+# Json_Store's default for meta, which holds the window itself under "days".
+def to_json(obj):
+    return obj.to_json()
+
+# (date, readers, writers) for every day a meta snapshot knows about, oldest first,
+# whether it's from before the window could be resized or after.
+def meta_days(meta: dict) -> list:
+    days = meta.get("days")
+    if isinstance(days, Day_Window):
+        days = days.to_json()
+    # Scored padding doesn't know who reacted, it would only wipe what older snapshots saw.
+    if days is not None:
+        return [(day["date"], day.get("readers", []), day.get("writers", [])) for day in days if not day.get("scored")]
+    
+    last_updated = meta.get("last_updated_date")
+    if not last_updated:
+        return []
+    today = datetime.date.fromisoformat(last_updated)
+    return [
+        ((today - datetime.timedelta(days=offset)).isoformat(), meta.get(day + "readers", []), meta.get(day + "writers", []))
+        for day, offset in sorted(LEGACY_DAY_OFFSETS.items(), key=lambda item: -item[1])
+    ]
+
+# Moves the old fixed buckets and tracker_message_ids into a window,
+# taking them out of meta. Message ids line up with the newest days.
+# Also returns the days a window shorter than three had no room for, see Day_Window.load.
+def window_from_legacy(meta: dict, size: int, today: str) -> tuple:
+    window = Day_Window(size)
+    message_ids = meta.pop("tracker_message_ids", [])
+    days = meta_days(meta) if meta.get("last_updated_date") else []
+    legacy = []
+    for position, (date, readers, writers) in enumerate(days):
+        from_end = len(days) - position
+        message_id = message_ids[-from_end] if len(message_ids) >= from_end else None
+        legacy.append({"date": date, "message_id": message_id, "readers": readers, "writers": writers})
+    dropped = window.load(legacy)
+    for day in LEGACY_DAY_OFFSETS:
+        for category in CATEGORIES:
+            meta.pop(day + category, None)
+    window.fill(meta.get("last_updated_date") or today)
+    return window, dropped
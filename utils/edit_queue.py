@@ -0,0 +1,142 @@
+import asyncio
+import hashlib
+import time
+from collections import deque
+from utils.json_store import Json_Store
+from utils.rate_limit import SEND_BUDGET, CHANNEL_BUCKET_SIZE, CHANNEL_BUCKET_PERIOD
+
+# Discord lets a bot edit roughly 5 messages per 5 seconds in one channel
+# before it starts handing out 429s, so anything past that just waits.
+BUCKET_SIZE = CHANNEL_BUCKET_SIZE
+BUCKET_PERIOD = CHANNEL_BUCKET_PERIOD
+
+def render_hash(content: str) -> str:
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+# Coalesces message edits so a burst of reactions only sends the newest
+# content for each message, at most once per window.
+# With a rendered_path, the hash of what each message last got edited to
+# is kept on disk too, and edits that wouldn't change anything are skipped.
+class Edit_Queue:
+    def __init__(self, window: float = 2.0, bucket_size: int = BUCKET_SIZE, bucket_period: float = BUCKET_PERIOD,
+                 rendered_path: str = None):
+        self.window = window
+        self.bucket_size = bucket_size
+        self.bucket_period = bucket_period
+        
+        # message id -> (channel, newest content)
+        self.pending = {}
+        # message id -> content of the edit currently being sent
+        self.in_flight = {}
+        self.flush_tasks = {}
+        self.last_flush = {}
+        # channel id -> timestamps of recent edits in that channel
+        self.buckets = {}
+        # str(message id) -> hash of the content it was last edited to
+        self.rendered_store = Json_Store(rendered_path) if rendered_path else None
+        self.rendered = self.rendered_store.load() if self.rendered_store else {}
+        
+        self.coalesced = 0
+        self.sent = 0
+        self.dropped = 0
+        self.unchanged = 0
+        
+    # What the message will show once nothing else changes it,
+    # an edit that's already on its way counts over the last one that landed.
+    def current_hash(self, message_id: int):
+        if message_id in self.in_flight:
+            return render_hash(self.in_flight[message_id])
+        return self.rendered.get(str(message_id))
+    
+    def schedule(self, channel, message_id: int, content: str):
+        # Only skipped when nothing else is waiting, a pending edit
+        # could be about to change the message to something else.
+        if message_id not in self.pending and self.current_hash(message_id) == render_hash(content):
+            self.unchanged += 1
+            return
+        if message_id in self.pending:
+            self.coalesced += 1
+        self.pending[message_id] = (channel, content)
+        
+        if message_id not in self.flush_tasks:
+            self.flush_tasks[message_id] = asyncio.create_task(self.flush_later(message_id))
+            
+    def stats(self) -> dict:
+        return {
+            "coalesced": self.coalesced,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "unchanged": self.unchanged,
+            "pending": len(self.pending),
+        }
+        
+    # Drops the hashes of messages that won't be edited anymore.
+    def forget(self, keep_ids):
+        keep = {str(message_id) for message_id in keep_ids}
+        for message_id in [message_id for message_id in self.rendered if message_id not in keep]:
+            del self.rendered[message_id]
+        self.mark_rendered()
+        
+    def mark_rendered(self):
+        if self.rendered_store:
+            self.rendered_store.mark_dirty()
+    
+    async def flush_later(self, message_id: int):
+        try:
+            # The first edit after a quiet period goes out right away,
+            # everything after that waits for the window to pass.
+            wait = self.last_flush.get(message_id, 0) + self.window - time.monotonic()
+            await asyncio.sleep(max(wait, 0))
+            
+            channel, _ = self.pending[message_id]
+            await self.wait_for_bucket(channel.id)
+            
+            # Popped after waiting so whatever came in meanwhile is what gets sent.
+            channel, content = self.pending.pop(message_id)
+            self.last_flush[message_id] = time.monotonic()
+            await self.edit(channel, message_id, content)
+        finally:
+            self.flush_tasks.pop(message_id, None)
+            
+        # Something was scheduled while the edit was in flight.
+        if message_id in self.pending:
+            self.flush_tasks[message_id] = asyncio.create_task(self.flush_later(message_id))
+    
+    async def wait_for_bucket(self, channel_id: int):
+        bucket = self.buckets.setdefault(channel_id, deque())
+        while True:
+            now = time.monotonic()
+            while bucket and now - bucket[0] >= self.bucket_period:
+                bucket.popleft()
+            if len(bucket) < self.bucket_size:
+                bucket.append(now)
+                return
+            await asyncio.sleep(bucket[0] + self.bucket_period - now)
+            
+    async def edit(self, channel, message_id: int, content: str):
+        SEND_BUDGET.spend(channel.id)
+        self.in_flight[message_id] = content
+        try:
+            message = channel.get_partial_message(message_id)
+            await message.edit(content=content)
+            self.sent += 1
+            # Only recorded once the edit went through, a dropped edit gets tried again next time.
+            self.rendered[str(message_id)] = render_hash(content)
+            self.mark_rendered()
+        except Exception as e:
+            self.dropped += 1
+            print(f"Couldn't edit message {message_id}: {e}")
+        finally:
+            self.in_flight.pop(message_id, None)
+            
+    # Sends everything that's still waiting, used when the cog shuts down.
+    async def flush(self):
+        for task in list(self.flush_tasks.values()):
+            task.cancel()
+        self.flush_tasks.clear()
+        
+        for message_id, (channel, content) in list(self.pending.items()):
+            del self.pending[message_id]
+            await self.edit(channel, message_id, content)
+        if self.rendered_store:
+            await self.rendered_store.flush()
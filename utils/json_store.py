@@ -0,0 +1,81 @@
+import asyncio
+import json, os
+import tempfile
+
+# Writes to a temp file next to the real one and swaps it in,
+# so a crash halfway through a write never leaves a half-written file behind.
+# Every write gets its own temp file, two at once can't end up in the same one.
+def atomic_write_json(path: str, obj, indent: int = 2):
+    write_text_atomic(path, json.dumps(obj, indent=indent))
+    
+def write_text_atomic(path: str, text: str):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    
+def read_json(path: str, default=None):
+    if not os.path.exists(path):
+        return {} if default is None else default
+    with open(path, "r") as f:
+        return json.load(f)
+
+# Keeps a JSON file in memory as the source of truth and writes it back
+# a little after the last change instead of on every change.
+class Json_Store:
+    def __init__(self, path: str, delay: float = 1.0, default=None):
+        self.path = path
+        self.delay = delay
+        # Passed on to json.dumps, for state that keeps live objects around.
+        self.default = default
+        self.state = None
+        self.dirty = False
+        self.save_task = None
+        self.flush_event = asyncio.Event()
+        # The debounced save and a direct save() can overlap, this keeps them in order.
+        self.save_lock = asyncio.Lock()
+        
+    def load(self):
+        self.state = read_json(self.path)
+        return self.state
+    
+    def mark_dirty(self):
+        self.dirty = True
+        if self.save_task is None or self.save_task.done():
+            self.save_task = asyncio.create_task(self.save_later())
+            
+    async def save_later(self):
+        # Keeps going while changes come in during a write,
+        # so nothing marked dirty mid-write gets lost.
+        while self.dirty:
+            try:
+                await asyncio.wait_for(self.flush_event.wait(), self.delay)
+            except asyncio.TimeoutError:
+                pass
+            await self.save()
+        
+    async def save(self):
+        # Serializing happens on the event loop so nothing can change
+        # the state halfway through, only the disk write goes to a thread.
+        # It waits for the lock first, so whichever save goes last also writes the newest state.
+        async with self.save_lock:
+            self.dirty = False
+            text = json.dumps(self.state, indent=2, default=self.default)
+            try:
+                await asyncio.to_thread(write_text_atomic, self.path, text)
+            except OSError as e:
+                print(f"Couldn't save {self.path}: {e}")
+            
+    # Skips the debounce and waits for everything pending to hit the disk.
+    async def flush(self):
+        if self.save_task is None or self.save_task.done():
+            return
+        self.flush_event.set()
+        await self.save_task
+        self.flush_event.clear()
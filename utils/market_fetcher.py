@@ -0,0 +1,93 @@
+import asyncio
+import os
+import aiohttp
+from utils.json_store import atomic_write_json, read_json, write_text_atomic
+
+# aiohttp only decodes brotli when the Brotli package is around,
+# so only ask for it then.
+try:
+    import brotli
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+    
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Sent with every request, and what the crawler checks robots.txt for.
+USER_AGENT = "ElectricSheep-Bot"
+
+# Fetches pages with conditional requests, remembering each URL's
+# ETag and Last-Modified so an unchanged page costs a 304 and nothing else.
+class Market_Fetcher:
+    def __init__(self, validators_path: str, timeout: float = 30, retries: int = 3, backoff: float = 2.0,
+                 connections: int = 4, autosave: bool = True, user_agent: str = USER_AGENT):
+        self.validators_path = validators_path
+        self.user_agent = user_agent
+        self.connections = connections
+        # Crawls turn this off and call save_validators themselves,
+        # instead of rewriting the file after every page.
+        self.autosave = autosave
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.validators = read_json(validators_path)
+        self.session = None
+        
+    async def open(self):
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                connector=aiohttp.TCPConnector(limit=self.connections),
+                headers={"Accept-Encoding": ACCEPT_ENCODING, "User-Agent": self.user_agent},
+            )
+            
+    async def close(self):
+        if self.session and not self.session.closed:
+            await self.session.close()
+            
+    async def save_validators(self):
+        await asyncio.to_thread(atomic_write_json, self.validators_path, dict(self.validators))
+    
+    # Returns (changed, html), html is None when the server said 304.
+    # The fetched page is also written to cache_path, if there is one,
+    # otherwise the caller has to keep whatever it parsed last time.
+    async def fetch(self, url: str, cache_path: str = None) -> tuple:
+        await self.open()
+        headers = {}
+        validators = self.validators.get(url, {})
+        # Without the cached copy a 304 would leave nothing to parse.
+        if cache_path is None or os.path.exists(cache_path):
+            if validators.get("etag"):
+                headers["If-None-Match"] = validators["etag"]
+            if validators.get("last_modified"):
+                headers["If-Modified-Since"] = validators["last_modified"]
+        
+        for attempt in range(self.retries + 1):
+            try:
+                async with self.session.get(url, headers=headers) as response:
+                    if response.status == 304:
+                        print(f"{url} not modified since last fetch.")
+                        return False, None
+                    if response.status in RETRY_STATUSES and attempt < self.retries:
+                        raise aiohttp.ClientResponseError(
+                            response.request_info, response.history, status=response.status
+                        )
+                    response.raise_for_status()
+                    html = await response.text()
+                    
+                    self.validators[url] = {
+                        "etag": response.headers.get("ETag"),
+                        "last_modified": response.headers.get("Last-Modified"),
+                    }
+                    if cache_path:
+                        await asyncio.to_thread(write_text_atomic, cache_path, html)
+                    if self.autosave:
+                        await self.save_validators()
+                    return True, html
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if isinstance(e, aiohttp.ClientResponseError) and e.status not in RETRY_STATUSES:
+                    raise
+                if attempt == self.retries:
+                    raise
+                delay = self.backoff * 2 ** attempt
+                print(f"Fetching {url} failed ({e}), retrying in {delay:.0f}s.")
+                await asyncio.sleep(delay)
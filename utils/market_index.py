@@ -0,0 +1,75 @@
+import re
+from collections import defaultdict
+
+WORD = re.compile(r"\w+")
+PER_WORD = re.compile(r"(\d+(?:\.\d+)?)\s*¢/word")
+DOLLARS_PER_WORD = re.compile(r"\$(\d*\.\d+)/word")
+
+# Sorts the grinder's free-form pay text into a few tiers people actually search by.
+# Pro and semi-pro follow the usual per-word cutoffs of 8¢ and 1¢.
+def pay_tier(pay: str) -> str:
+    if "Non-Paying" in pay:
+        return "non-paying"
+    if "fees" in pay.lower():
+        return "fees"
+    if pay in ("Unknown", "Unspecified", ""):
+        return "unknown"
+    
+    cents = None
+    if PER_WORD.search(pay):
+        cents = float(PER_WORD.search(pay).group(1))
+    elif DOLLARS_PER_WORD.search(pay):
+        cents = float(DOLLARS_PER_WORD.search(pay).group(1)) * 100
+    if cents is not None and cents >= 8:
+        return "pro"
+    if cents is not None and cents >= 1:
+        return "semi-pro"
+    return "token"
+
+PAYING_TIERS = ("pro", "semi-pro", "token")
+
+# Inverted indexes over one market snapshot, built once so a search
+# is just a few set intersections instead of a pass over every market.
+class Market_Index:
+    def __init__(self, markets: dict):
+        self.markets = markets
+        self.genres = defaultdict(set)
+        self.lengths = defaultdict(set)
+        self.tiers = defaultdict(set)
+        self.statuses = defaultdict(set)
+        self.words = defaultdict(set)
+        
+        for market, record in markets.items():
+            for genre in record["genres"]:
+                self.genres[genre.lower()].add(market)
+            for length in record["lengths"]:
+                self.lengths[length.lower()].add(market)
+            tier = pay_tier(record["pay"])
+            self.tiers[tier].add(market)
+            if tier in PAYING_TIERS:
+                self.tiers["paying"].add(market)
+            self.statuses["temp-closed" if record["temp_closed"] else "open"].add(market)
+            for word in WORD.findall(record["name"].lower()):
+                self.words[word].add(market)
+                
+    # A partial value like "sci" matches every key containing it.
+    @staticmethod
+    def lookup(index: dict, value: str) -> set:
+        value = value.lower()
+        if value in index:
+            return index[value]
+        found = set()
+        for key, markets in index.items():
+            if value in key:
+                found |= markets
+        return found
+    
+    def search(self, genre: str = None, length: str = None, pay: str = None, status: str = None, text: str = None) -> list:
+        matches = set(self.markets)
+        for index, value in ((self.genres, genre), (self.lengths, length), (self.tiers, pay), (self.statuses, status)):
+            if value:
+                matches &= self.lookup(index, value)
+        if text:
+            for word in WORD.findall(text.lower()):
+                matches &= self.lookup(self.words, word)
+        return sorted((self.markets[market] for market in matches), key=lambda record: record["name"].lower())
@@ -0,0 +1,130 @@
+import os
+import re
+import time
+from bs4 import BeautifulSoup
+
+# lxml is the fast path, BeautifulSoup stays around as the reference
+# implementation and as the fallback when lxml isn't installed.
+try:
+    import lxml.html
+except ImportError:
+    lxml = None
+    
+SECTION_ID = "divRecentlyAddedMarketsTabArea"
+DIV_TAG = re.compile(r"<(/?)div\b", re.IGNORECASE)
+
+def parse_recently_added_bs4(html, base_url: str) -> list:
+    soup = BeautifulSoup(html, "html.parser")
+
+    section = soup.find("div", id=SECTION_ID)
+    if not section:
+        print("Could not find Recently Added Markets section")
+        return []
+
+    entries = []
+    rows = section.find_all("div", class_=lambda x: x and x.startswith("MarketSearchListingRow"))
+
+    for row in rows:
+        name_tag = row.find("div", class_=lambda x: x and "Name" in x)
+        name = name_tag.get_text(strip=True) if name_tag else "Unnamed"
+        link_tag = name_tag.find("a") if name_tag else None
+        link = base_url + link_tag["href"] if link_tag else ""
+
+        genres = row.find("div", class_=lambda x: x and "Genre" in x)
+        genre_list = []
+        if genres:
+            icons = genres.find_all("img")
+            genre_list = [icon.get("alt") for icon in icons if icon.get("alt")]
+
+        lengths = row.find("div", class_=lambda x: x and "Length" in x)
+        length_list = []
+        if lengths:
+            icons = lengths.find_all("img")
+            length_list = [icon.get("alt") for icon in icons if icon.get("alt")]
+
+        pay_tag = row.find("span")
+        pay = pay_tag.get_text(strip=True) if pay_tag else "Unspecified"
+
+        entries.append({
+            "name": name,
+            "link": link,
+            "genres": genre_list,
+            "lengths": length_list,
+            "pay": pay
+        })
+    return entries
+
+# Finds where the Recently Added section starts and its matching </div> ends
+# with a plain tag scan, so only that part of the page ever gets parsed.
+def section_bounds(html: str) -> tuple:
+    id_index = html.find(f'id="{SECTION_ID}"')
+    if id_index == -1:
+        return None
+    start = html.rfind("<div", 0, id_index)
+    
+    depth = 0
+    for tag in DIV_TAG.finditer(html, start):
+        depth += -1 if tag.group(1) else 1
+        if depth == 0:
+            return start, html.find(">", tag.end()) + 1
+    # Unbalanced markup, just take everything after the start.
+    return start, len(html)
+
+# BeautifulSoup's get_text(strip=True) glues the stripped pieces together with nothing in between.
+def stripped_text(element) -> str:
+    return "".join(text.strip() for text in element.itertext() if text.strip())
+
+def parse_recently_added_lxml(html, base_url: str) -> list:
+    bounds = section_bounds(html) if html else None
+    if not bounds:
+        print("Could not find Recently Added Markets section")
+        return []
+    section = lxml.html.fragment_fromstring(html[bounds[0]:bounds[1]])
+
+    entries = []
+    for row in section.xpath(".//div[starts-with(@class, 'MarketSearchListingRow')]"):
+        name_tag = next(iter(row.xpath(".//div[contains(@class, 'Name')]")), None)
+        name = stripped_text(name_tag) if name_tag is not None else "Unnamed"
+        link_tag = next(iter(name_tag.xpath(".//a")), None) if name_tag is not None else None
+        link = base_url + link_tag.get("href") if link_tag is not None else ""
+        
+        genre_list = row.xpath("(.//div[contains(@class, 'Genre')])[1]//img/@alt")
+        length_list = row.xpath("(.//div[contains(@class, 'Length')])[1]//img/@alt")
+        
+        pay_tag = next(iter(row.xpath("(.//span)[1]")), None)
+        pay = stripped_text(pay_tag) if pay_tag is not None else "Unspecified"
+        
+        entries.append({
+            "name": name,
+            "link": link,
+            "genres": [str(alt) for alt in genre_list if alt],
+            "lengths": [str(alt) for alt in length_list if alt],
+            "pay": pay
+        })
+    return entries
+
+PARSERS = {"bs4": parse_recently_added_bs4}
+if lxml:
+    PARSERS["lxml"] = parse_recently_added_lxml
+DEFAULT_PARSER = os.getenv("GRINDER_PARSER", "lxml" if lxml else "bs4")
+
+def parse_recently_added(html, base_url: str, parser: str = DEFAULT_PARSER) -> list:
+    return PARSERS.get(parser, parse_recently_added_bs4)(html, base_url)
+
+# Times every backend on the same page and checks they all find the same markets.
+# Run from the repo root with: python -m utils.market_parser
+def benchmark(html: str, runs: int = 20) -> dict:
+    reference = parse_recently_added_bs4(html, "")
+    results = {}
+    for name, parser in PARSERS.items():
+        start = time.perf_counter()
+        for _ in range(runs):
+            entries = parser(html, "")
+        results[name] = ((time.perf_counter() - start) / runs, entries == reference)
+    return results
+
+if __name__ == "__main__":
+    with open("data/cached_website.html", "r", encoding="utf-8") as f:
+        html = f.read()
+    for name, (seconds, matches) in benchmark(html).items():
+        print(f"{name}: {seconds * 1000:.2f}ms per parse, matches bs4: {matches}")
@@ -0,0 +1,144 @@
+import hashlib
+import json
+import re
+from utils.json_store import atomic_write_json, read_json
+
+MARKET_ID = re.compile(r"/Market/Index/(\d+)")
+TEMP_CLOSED = "- Temp Closed -"
+# Matches the lines the grinder cog used to post, for seeding from new_markets_message.txt.
+MARKET_LINE = re.compile(
+    r"\[\*\*(?P<name>.+?)\*\*\]\((?P<link>.*?)\) — Genres: \*(?P<genres>.*?)\*, "
+    r"Lengths: \*(?P<lengths>.*?)\*, Pay: \*(?P<pay>.*?)\*"
+)
+
+# The grinder's own id from the market link, or the name if there's no link.
+def market_id(link: str, name: str) -> str:
+    match = MARKET_ID.search(link or "")
+    return match.group(1) if match else name
+
+def content_hash(record: dict) -> str:
+    fields = [record["name"], record["genres"], record["lengths"], record["pay"], record["temp_closed"]]
+    return hashlib.sha1(json.dumps(fields).encode()).hexdigest()
+
+# Turns a parsed entry into a record keyed by market id,
+# with the temp closed marker pulled out of the name into a flag.
+def make_record(entry: dict) -> dict:
+    name = entry["name"]
+    temp_closed = TEMP_CLOSED in name
+    if temp_closed:
+        name = name.replace(TEMP_CLOSED, "").strip()
+    record = {
+        "id": market_id(entry["link"], name),
+        "name": name,
+        "link": entry["link"],
+        "genres": entry["genres"],
+        "lengths": entry["lengths"],
+        "pay": entry["pay"],
+        "temp_closed": temp_closed,
+    }
+    record["hash"] = content_hash(record)
+    return record
+
+def make_records(entries: list) -> dict:
+    records = {}
+    for entry in entries:
+        record = make_record(entry)
+        records[record["id"]] = record
+    return records
+
+def records_from_lines(lines: list) -> dict:
+    entries = []
+    for line in lines:
+        match = MARKET_LINE.search(line)
+        if not match:
+            continue
+        entries.append({
+            "name": match["name"],
+            "link": match["link"],
+            "genres": [] if match["genres"] == "Unspecified" else match["genres"].split(", "),
+            "lengths": [] if match["lengths"] == "Unspecified" else match["lengths"].split(", "),
+            "pay": match["pay"],
+        })
+    return make_records(entries)
+
+# Everything that happened between two snapshots, found with set and dict lookups.
+# Reopened means it was temp closed before and isn't anymore,
+# any other difference in content counts as changed.
+def diff_markets(old: dict, new: dict) -> dict:
+    added = new.keys() - old.keys()
+    removed = old.keys() - new.keys()
+    reopened = []
+    changed = []
+    for market in new.keys() & old.keys():
+        if old[market]["hash"] == new[market]["hash"]:
+            continue
+        if old[market]["temp_closed"] and not new[market]["temp_closed"]:
+            reopened.append(market)
+        else:
+            changed.append(market)
+    return {
+        "added": [new[market] for market in added],
+        "removed": [old[market] for market in removed],
+        "reopened": [new[market] for market in reopened],
+        "changed": [new[market] for market in changed],
+    }
+
+# The markets as of the last post, so the next one can be diffed against it.
+class Market_Store:
+    def __init__(self, path: str):
+        self.path = path
+        self.markets = None
+        
+    # Returns None when nothing has been stored yet.
+    def load(self):
+        stored = read_json(self.path, default=None)
+        self.markets = stored.get("markets") if stored else None
+        return self.markets
+    
+    def seed_from_lines(self, lines: list):
+        self.markets = records_from_lines(lines)
+        
+    def update(self, markets: dict) -> dict:
+        previous = self.markets if self.markets is not None else markets
+        changes = diff_markets(previous, markets)
+        self.markets = markets
+        return changes
+    
+    def save(self):
+        atomic_write_json(self.path, {"markets": self.markets})
+
+def html_hash(html: str) -> str:
+    return hashlib.sha256(html.encode()).hexdigest()
+
+# Bump this if the record format changes, so old snapshots get re-parsed.
+SNAPSHOT_FORMAT = 1
+
+# The most recently parsed page, kept in memory and on disk so nothing
+# has to parse the same HTML twice, even across restarts.
+class Market_Snapshot:
+    def __init__(self, path: str):
+        self.path = path
+        self.version = 0
+        self.html_hash = None
+        self.markets = None
+        
+    def load(self):
+        stored = read_json(self.path)
+        if stored.get("format") != SNAPSHOT_FORMAT:
+            return
+        self.version = stored["version"]
+        self.html_hash = stored["html_hash"]
+        self.markets = stored["markets"]
+        
+    def replace(self, digest: str, markets: dict):
+        self.version += 1
+        self.html_hash = digest
+        self.markets = markets
+        
+    def save(self):
+        atomic_write_json(self.path, {
+            "format": SNAPSHOT_FORMAT,
+            "version": self.version,
+            "html_hash": self.html_hash,
+            "markets": self.markets,
+        }, indent=None)
@@ -0,0 +1,87 @@
+import asyncio
+import time
+from utils.json_store import Json_Store
+
+# Names older than this still get shown, they just get refreshed in the background.
+NAME_TTL = 7 * 24 * 60 * 60
+MAX_NAMES = 5000
+# Discord only answers up to 100 user ids per member request.
+QUERY_CHUNK = 100
+
+# Display names by user id, kept on disk so a restart doesn't mean
+# looking everyone up again.
+class Member_Cache:
+    def __init__(self, path: str, ttl: float = NAME_TTL, max_names: int = MAX_NAMES):
+        self.store = Json_Store(path)
+        self.ttl = ttl
+        self.max_names = max_names
+        self.names = {}
+        self.refresh_task = None
+        
+    def load(self):
+        self.names = self.store.load()
+        
+    def __contains__(self, user_id) -> bool:
+        return str(user_id) in self.names
+    
+    def __getitem__(self, user_id) -> str:
+        entry = self.names.get(str(user_id))
+        return entry["name"] if entry else f"Unknown User ({user_id})"
+    
+    def set(self, user_id, name: str):
+        self.names[str(user_id)] = {"name": name, "fetched": time.time()}
+        self.store.mark_dirty()
+        
+    def missing(self, user_ids) -> list:
+        return [str(user_id) for user_id in user_ids if str(user_id) not in self.names]
+    
+    def expired(self, user_ids) -> list:
+        cutoff = time.time() - self.ttl
+        return [
+            str(user_id) for user_id in user_ids
+            if str(user_id) in self.names and self.names[str(user_id)]["fetched"] < cutoff
+        ]
+        
+    # Looks up every id in one gateway request per 100 users
+    # instead of one fetch_member call per user.
+    async def refresh(self, guild, user_ids: list):
+        user_ids = [int(user_id) for user_id in user_ids]
+        for i in range(0, len(user_ids), QUERY_CHUNK):
+            chunk = user_ids[i:i + QUERY_CHUNK]
+            try:
+                members = await guild.query_members(user_ids=chunk, limit=len(chunk), cache=True)
+            except (asyncio.TimeoutError, ValueError) as e:
+                print(f"Couldn't query member names: {e}")
+                continue
+            
+            found = {member.id: member.display_name for member in members}
+            for user_id in chunk:
+                # People who left the server are remembered too,
+                # so they don't get looked up again on every render.
+                self.set(user_id, found.get(user_id, f"Unknown User ({user_id})"))
+        self.evict()
+        
+    # Missing names are waited on since there's nothing to show yet,
+    # expired ones keep their old name until the background refresh lands.
+    async def ensure(self, guild, user_ids):
+        missing = self.missing(user_ids)
+        if missing:
+            print(f"Fetching {len(missing)} missing member names")
+            await self.refresh(guild, missing)
+            
+        expired = self.expired(user_ids)
+        if expired and (self.refresh_task is None or self.refresh_task.done()):
+            self.refresh_task = asyncio.create_task(self.refresh(guild, expired))
+            
+    def evict(self):
+        if len(self.names) <= self.max_names:
+            return
+        oldest = sorted(self.names, key=lambda user_id: self.names[user_id]["fetched"])
+        for user_id in oldest[:len(self.names) - self.max_names]:
+            del self.names[user_id]
+        self.store.mark_dirty()
+        
+    async def flush(self):
+        if self.refresh_task and not self.refresh_task.done():
+            self.refresh_task.cancel()
+        await self.store.flush()
@@ -0,0 +1,85 @@
+from utils.rate_limit import SEND_BUDGET
+
+MESSAGE_LIMIT = 2000
+EMBED_DESCRIPTION_LIMIT = 4096
+EMBED_TOTAL_LIMIT = 6000
+EMBEDS_PER_MESSAGE = 10
+
+# Breaks one line that's too long for a message on its own,
+# at the last space before the limit when there is one.
+def split_long_line(line: str, limit: int) -> list:
+    pieces = []
+    while len(line) > limit:
+        cut = line.rfind(" ", 0, limit + 1)
+        if cut <= 0:
+            cut = limit
+        pieces.append(line[:cut])
+        line = line[cut:].lstrip(" ")
+    pieces.append(line)
+    return pieces
+
+# Items are plain lines or (header, lines) sections. A section header always
+# stays in the same message as the section's first line. Lines get joined
+# with newlines and the newlines are counted, so every message really fits.
+def pack(items, limit: int = MESSAGE_LIMIT):
+    current = ""
+    
+    for item in items:
+        if isinstance(item, str):
+            blocks = [item]
+        else:
+            header, lines = item
+            lines = list(lines)
+            blocks = ["\n".join([header, *lines[:1]]), *lines[1:]]
+            
+        for block in blocks:
+            if current and len(current) + 1 + len(block) <= limit:
+                current += "\n" + block
+                continue
+            if current:
+                yield current
+            current = ""
+            
+            if len(block) <= limit:
+                current = block
+                continue
+            # Too long even on its own, so it gets cut up.
+            for line in block.split("\n"):
+                for piece in split_long_line(line, limit):
+                    if current and len(current) + 1 + len(piece) <= limit:
+                        current += "\n" + piece
+                    else:
+                        if current:
+                            yield current
+                        current = piece
+    if current:
+        yield current
+
+# Groups embeds (or bare descriptions) so each message stays under Discord's
+# 10 embeds and 6000 characters total per message.
+def pack_embeds(descriptions, title_length: int = 0):
+    group = []
+    total = 0
+    for description in descriptions:
+        size = len(description) + title_length
+        if group and (len(group) == EMBEDS_PER_MESSAGE or total + size > EMBED_TOTAL_LIMIT):
+            yield group
+            group = []
+            total = 0
+        group.append(description)
+        total += size
+    if group:
+        yield group
+
+# Sends one message at a time so they show up in order. Packing is cheap next
+# to a round trip to Discord, so there's nothing worth overlapping with the sends.
+# Messages are strings, or dicts of keyword arguments for channel.send.
+async def send_all(channel, messages) -> list:
+    sent = []
+    for content in messages:
+        SEND_BUDGET.spend(channel.id)
+        if isinstance(content, dict):
+            sent.append(await channel.send(**content))
+        else:
+            sent.append(await channel.send(content))
+    return sent
@@ -0,0 +1,91 @@
+import time
+
+HIGH = 0
+LOW = 1
+# Discord lets a bot send or edit roughly 5 messages per 5 seconds in one channel
+# before it starts handing out 429s. That's what actually runs out, the global
+# 50 per second never gets close with one edit queue and a few sends per channel.
+CHANNEL_BUCKET_SIZE = 5
+CHANNEL_BUCKET_PERIOD = 5.0
+
+class Token_Bucket:
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_per_second)
+        self.updated = now
+        return self.tokens
+        
+    def take(self, amount: float = 1) -> bool:
+        if self.refill() < amount:
+            return False
+        self.tokens -= amount
+        return True
+    
+    # For traffic that goes out no matter what, it still counts against the bucket
+    # so lower priority traffic backs off after a burst.
+    def force_take(self, amount: float = 1):
+        self.refill()
+        self.tokens = max(self.tokens - amount, -self.capacity)
+
+# A rough picture of each channel's send and edit bucket. Every send and edit
+# counts against its channel. Tracker and grinder traffic always goes out, novelty
+# replies only while more than `reserve` requests are left, otherwise they wait.
+class Send_Budget:
+    def __init__(self, capacity: float = CHANNEL_BUCKET_SIZE, period: float = CHANNEL_BUCKET_PERIOD, reserve: float = 2):
+        self.capacity = capacity
+        self.refill_per_second = capacity / period
+        self.reserve = reserve
+        self.buckets = {}
+        # How many times a low priority send was told to wait.
+        self.deferred = 0
+        
+    def bucket(self, channel_id: int) -> Token_Bucket:
+        if channel_id not in self.buckets:
+            self.buckets[channel_id] = Token_Bucket(self.capacity, self.refill_per_second)
+        return self.buckets[channel_id]
+    
+    def spend(self, channel_id: int, priority: int = HIGH) -> bool:
+        bucket = self.bucket(channel_id)
+        if priority == HIGH:
+            bucket.force_take()
+            return True
+        if bucket.refill() - 1 < self.reserve:
+            self.deferred += 1
+            return False
+        bucket.take()
+        return True
+    
+    # Seconds until a low priority send in this channel would be let through.
+    def wait_time(self, channel_id: int) -> float:
+        missing = self.reserve + 1 - self.bucket(channel_id).refill()
+        return max(missing / self.refill_per_second, 0)
+
+# Shared by every cog, so they all see the same budget.
+SEND_BUDGET = Send_Budget()
+
+# One token bucket per (channel, trigger), so one trigger getting spammed
+# in one channel doesn't stop it anywhere else or stop other triggers.
+class Response_Limiter:
+    def __init__(self, burst: float = 3, refill_seconds: float = 10):
+        self.burst = burst
+        self.refill_seconds = refill_seconds
+        self.buckets = {}
+        self.limited = 0
+        
+    def allow(self, channel_id: int, trigger: dict) -> bool:
+        key = (channel_id, trigger["name"])
+        if key not in self.buckets:
+            self.buckets[key] = Token_Bucket(
+                trigger.get("burst", self.burst),
+                1 / trigger.get("refill_seconds", self.refill_seconds),
+            )
+        if self.buckets[key].take():
+            return True
+        self.limited += 1
+        return False
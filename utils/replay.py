@@ -0,0 +1,108 @@
+import datetime
+import time
+from utils.day_window import Day_Window, meta_days
+from utils.scoring import Score_Engine
+
+# numpy is only needed for the fast path, the plain loop below gives the same answer.
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# date -> (readers, writers) from meta snapshots like the ones in new_meta_log.json,
+# newer snapshots win for days more than one of them saw.
+def history_from_snapshots(snapshots: list) -> dict:
+    history = {}
+    snapshots = sorted(
+        (snapshot for snapshot in snapshots if snapshot.get("last_updated_date")),
+        key=lambda snapshot: snapshot["last_updated_date"],
+    )
+    for snapshot in snapshots:
+        for date, readers, writers in meta_days(snapshot):
+            history[date] = (
+                {str(user_id) for user_id in readers},
+                {str(user_id) for user_id in writers},
+            )
+    return history
+
+# Every calendar day from the first recorded one through the last one
+# the daily update has already scored, days nobody logged count as misses.
+def replay_dates(history: dict, last_scored: str) -> list:
+    if not history:
+        return []
+    day = datetime.date.fromisoformat(min(history))
+    end = datetime.date.fromisoformat(last_scored)
+    dates = []
+    while day <= end:
+        dates.append(day.isoformat())
+        day += datetime.timedelta(days=1)
+    return dates
+
+def replay_users(data: dict, history: dict) -> list:
+    users = dict.fromkeys(data)
+    for readers, writers in history.values():
+        users.update(dict.fromkeys(readers))
+        users.update(dict.fromkeys(writers))
+    return list(users)
+
+# Days in the range that no snapshot or reaction row covers. Those get replayed
+# as misses, which is only right if nobody really reacted that day.
+def replay_gaps(dates: list, history: dict) -> list:
+    return [date for date in dates if date not in history]
+
+# Runs every day through Score_Engine.roll_over, the same rule the daily
+# update uses, so this is what the fast path gets checked against.
+def replay_loop(users: list, dates: list, history: dict) -> dict:
+    scores = {user_id: {"read": 0, "write": 0} for user_id in users}
+    engine = Score_Engine()
+    for date in dates:
+        readers, writers = history.get(date, (set(), set()))
+        window = Day_Window(1)
+        window.append(date, readers=readers, writers=writers)
+        engine.rebuild(scores, window)
+        scores = {
+            user_id: {"read": engine.roll_over(user_id, "readers", 1), "write": engine.roll_over(user_id, "writers", 1)}
+            for user_id in users
+        }
+    return scores
+
+# Builds a users x days x {read, write} hit array and runs every user
+# through each day at once, so the Python loop is only over days.
+def replay_vectorized(users: list, dates: list, history: dict) -> dict:
+    if np is None:
+        print("numpy isn't installed, replaying with the plain loop instead.")
+        return replay_loop(users, dates, history)
+    
+    index = {user_id: i for i, user_id in enumerate(users)}
+    hits = np.zeros((len(users), len(dates), 2), dtype=bool)
+    for day, date in enumerate(dates):
+        readers, writers = history.get(date, (set(), set()))
+        hits[[index[user_id] for user_id in readers], day, 0] = True
+        hits[[index[user_id] for user_id in writers], day, 1] = True
+        
+    scores = np.zeros((len(users), 2), dtype=np.int64)
+    for day in range(len(dates)):
+        scores = np.where(hits[:, day, :], scores + 1, scores >> 1)
+        
+    return {
+        user_id: {"read": int(scores[i, 0]), "write": int(scores[i, 1])}
+        for user_id, i in index.items()
+    }
+
+# Runs both versions, returns the rebuilt scores plus how long each took,
+# any users where the two disagree (which should never happen) and the days history is missing.
+def rebuild_scores(data: dict, history: dict, last_scored: str) -> tuple:
+    users = replay_users(data, history)
+    dates = replay_dates(history, last_scored)
+    gaps = replay_gaps(dates, history)
+    
+    start = time.perf_counter()
+    rebuilt = replay_vectorized(users, dates, history)
+    vectorized_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    expected = replay_loop(users, dates, history)
+    loop_time = time.perf_counter() - start
+    
+    mismatches = [user_id for user_id in users if rebuilt[user_id] != expected[user_id]]
+    return rebuilt, vectorized_time, loop_time, mismatches, gaps
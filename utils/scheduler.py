@@ -0,0 +1,209 @@
+import asyncio
+import datetime
+import heapq
+import itertools
+import random
+import time
+from datetime import timedelta, timezone
+from zoneinfo import ZoneInfo
+from utils.json_store import Json_Store
+
+LEDGER_FILE = "data/scheduler_ledger.json"
+# The timer never sleeps longer than this in one go, so a suspended
+# machine or a clock change can't make it oversleep a run.
+MAX_SLEEP = 60
+# How far ahead or back a spec gets searched before giving up on it.
+SEARCH_DAYS = 5 * 366
+
+# One cron field, e.g. "*", "5", "1-5", "*/15" or "0,30".
+def parse_field(field: str, low: int, high: int) -> set:
+    values = set()
+    for part in field.split(","):
+        value, _, step = part.partition("/")
+        if value == "*":
+            start, end = low, high
+        elif "-" in value:
+            start, end = map(int, value.split("-"))
+        else:
+            start = int(value)
+            end = high if step else start
+        values.update(range(start, end + 1, int(step or 1)))
+    if not values or min(values) < low or max(values) > high:
+        raise ValueError(f"Bad cron field: {field}")
+    return values
+
+# "minute hour day-of-month month day-of-week", the same as cron,
+# with Sunday as 0. Times are read in whatever timezone the job uses.
+class Cron_Spec:
+    def __init__(self, spec: str):
+        fields = spec.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron spec needs 5 fields: {spec}")
+        self.spec = spec
+        minutes = parse_field(fields[0], 0, 59)
+        hours = parse_field(fields[1], 0, 23)
+        self.days = parse_field(fields[2], 1, 31)
+        self.months = parse_field(fields[3], 1, 12)
+        self.weekdays = parse_field(fields[4], 0, 6)
+        self.times = sorted((hour, minute) for hour in hours for minute in minutes)
+        # Like cron, when both day fields are restricted either one matching is enough.
+        self.either_day = fields[2] != "*" and fields[4] != "*"
+    
+    def day_matches(self, date: datetime.date) -> bool:
+        if date.month not in self.months:
+            return False
+        day = date.day in self.days
+        weekday = (date.weekday() + 1) % 7 in self.weekdays
+        return day or weekday if self.either_day else day and weekday
+    
+    def candidates(self, date: datetime.date, tz) -> list:
+        return [datetime.datetime.combine(date, datetime.time(hour, minute), tzinfo=tz) for hour, minute in self.times]
+    
+    # The first run strictly after moment.
+    def next_after(self, moment: datetime.datetime, tz) -> datetime.datetime:
+        date = moment.astimezone(tz).date()
+        for _ in range(SEARCH_DAYS):
+            if self.day_matches(date):
+                for candidate in self.candidates(date, tz):
+                    if candidate > moment:
+                        return candidate
+            date += timedelta(days=1)
+        raise ValueError(f"Cron spec never runs: {self.spec}")
+    
+    # The last run at or before moment.
+    def previous(self, moment: datetime.datetime, tz) -> datetime.datetime:
+        date = moment.astimezone(tz).date()
+        for _ in range(SEARCH_DAYS):
+            if self.day_matches(date):
+                for candidate in reversed(self.candidates(date, tz)):
+                    if candidate <= moment:
+                        return candidate
+            date -= timedelta(days=1)
+        raise ValueError(f"Cron spec never runs: {self.spec}")
+
+class Job:
+    def __init__(self, name: str, spec: str, callback, tz: str, jitter: float, group: str):
+        self.name = name
+        self.spec = Cron_Spec(spec)
+        self.callback = callback
+        self.timezone = ZoneInfo(tz)
+        self.jitter = jitter
+        # Jobs in the same group run one at a time, in the order they were due.
+        self.group = group or name
+        self.next_run = None
+
+# Every timed job in the bot on one heap and one timer task.
+# Each job's last completed run is kept in a ledger on disk, so a run
+# that was missed while the bot was down happens once it's back,
+# and nothing runs twice for the same scheduled time.
+class Scheduler:
+    def __init__(self, ledger_path: str = LEDGER_FILE):
+        self.ledger = Json_Store(ledger_path)
+        self.jobs = {}
+        self.heap = []
+        self.counter = itertools.count()
+        self.changed = asyncio.Event()
+        self.locks = {}
+        self.running = set()
+        self.task = None
+    
+    def last_run(self, name: str):
+        if self.ledger.state is None:
+            self.ledger.load()
+        last = self.ledger.state.get(name)
+        return datetime.datetime.fromisoformat(last) if last else None
+    
+    # callback gets the scheduled time, in the job's timezone.
+    # A job that has run before and missed its latest time gets run straight away.
+    def add_job(self, name: str, spec: str, callback, tz: str = "America/Los_Angeles",
+                jitter: float = 0, group: str = None, catch_up: bool = True):
+        job = Job(name, spec, callback, tz, jitter, group)
+        self.jobs[name] = job
+        now = datetime.datetime.now(timezone.utc)
+        last = self.last_run(name)
+        missed = job.spec.previous(now, job.timezone)
+        if catch_up and last and missed > last:
+            print(f"{name} missed its run at {missed.isoformat()}, catching up.")
+            self.push(job, missed, jitter=False)
+        else:
+            self.push(job, job.spec.next_after(now, job.timezone))
+        self.start()
+        return job
+    
+    # Anything of this job already on the heap just gets skipped.
+    def remove_job(self, name: str):
+        self.jobs.pop(name, None)
+        self.changed.set()
+    
+    def push(self, job: Job, scheduled: datetime.datetime, jitter: bool = True):
+        due = scheduled.timestamp() + (random.uniform(0, job.jitter) if jitter else 0)
+        job.next_run = scheduled
+        heapq.heappush(self.heap, (due, next(self.counter), job, scheduled))
+        self.changed.set()
+    
+    def start(self):
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run())
+    
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+        await self.ledger.flush()
+    
+    async def run(self):
+        while True:
+            self.changed.clear()
+            while self.heap and self.jobs.get(self.heap[0][2].name) is not self.heap[0][2]:
+                heapq.heappop(self.heap)
+            if not self.heap:
+                await self.changed.wait()
+                continue
+            
+            due, _, job, scheduled = self.heap[0]
+            wait = due - time.time()
+            if wait > 0:
+                try:
+                    await asyncio.wait_for(self.changed.wait(), min(wait, MAX_SLEEP))
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            
+            heapq.heappop(self.heap)
+            # If the loop itself fell behind by more than one run, only the latest one is kept.
+            now = datetime.datetime.now(timezone.utc)
+            following = job.spec.next_after(scheduled, job.timezone)
+            if following <= now:
+                self.push(job, job.spec.previous(now, job.timezone), jitter=False)
+            else:
+                self.push(job, following)
+            
+            task = asyncio.create_task(self.run_job(job, scheduled))
+            self.running.add(task)
+            task.add_done_callback(self.running.discard)
+    
+    async def run_job(self, job: Job, scheduled: datetime.datetime):
+        async with self.locks.setdefault(job.group, asyncio.Lock()):
+            last = self.last_run(job.name)
+            if last and last >= scheduled:
+                print(f"{job.name} already ran for {scheduled.isoformat()}, skipping.")
+                return
+            print(f"Running {job.name} for {scheduled.isoformat()}")
+            try:
+                await job.callback(scheduled)
+            except Exception as e:
+                # Left out of the ledger so it gets caught up after a restart.
+                print(f"{job.name} failed: {e!r}")
+                return
+            # Saved right away rather than debounced, a crash
+            # in between would mean running the job again.
+            self.ledger.state[job.name] = scheduled.isoformat()
+            await self.ledger.save()
+    
+    def status(self) -> list:
+        return [
+            (name, job.spec.spec, job.next_run, self.last_run(name))
+            for name, job in sorted(self.jobs.items())
+        ]
+
+# Shared by every cog, so all their jobs run off the same timer.
+SCHEDULER = Scheduler()
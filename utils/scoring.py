@@ -0,0 +1,209 @@
+from bisect import bisect_left, insort
+from itertools import islice
+from utils.day_window import Day_Window
+
+FIELDS = {"readers": "read", "writers": "write"}
+
+# Keeps every user's projected score and a sorted ranking per category,
+# so a reaction only has to re-score the one user who reacted.
+class Score_Engine:
+    def __init__(self):
+        self.data = {}
+        self.window = None
+        # First-seen order breaks ties the same way sorting data did.
+        self.order = {}
+        self.projected = {category: {} for category in FIELDS}
+        # Sorted lists of (-score, order, user_id), best first.
+        self.ranks = {category: [] for category in FIELDS}
+        
+    def rebuild(self, data: dict, window):
+        self.data = data
+        self.window = window
+        for user_id in data:
+            self.order.setdefault(user_id, len(self.order))
+            
+        for category in FIELDS:
+            self.projected[category] = {user_id: self.project(user_id, category) for user_id in data}
+            self.ranks[category] = sorted(
+                (-score, self.order[user_id], user_id) for user_id, score in self.projected[category].items()
+            )
+            
+    def has(self, slot, category: str, user_id: str) -> bool:
+        return user_id in slot.members[category]
+    
+    def set_member(self, slot, category: str, user_id: str, present: bool):
+        if present:
+            slot.members[category].add(user_id)
+        else:
+            slot.members[category].discard(user_id)
+        self.update_user(user_id)
+        
+    # Same rules as the daily update: missing a day halves the score,
+    # showing up adds one, and today only counts once it happened.
+    # upto stops at that position in the window, for showing an older day.
+    # Scored padding is already in the stored score, so it's skipped.
+    def project(self, user_id: str, category: str, upto: int = None) -> int:
+        score = self.data.get(user_id, {}).get(FIELDS[category], 0)
+        today = self.window.today
+        for position, slot in enumerate(self.window):
+            if upto is not None and position > upto:
+                break
+            if slot.scored:
+                continue
+            if user_id in slot.members[category]:
+                score += 1
+            elif slot is not today:
+                score //= 2
+        return score
+    
+    # What a score becomes after `periods` daily updates. The days in the
+    # window get scored oldest first, and any update past them can only
+    # halve it, so those all happen in one shift.
+    def roll_over(self, user_id: str, category: str, periods: int) -> int:
+        score = self.data.get(user_id, {}).get(FIELDS[category], 0)
+        for slot in islice(self.window, periods):
+            if slot.scored:
+                continue
+            if user_id in slot.members[category]:
+                score += 1
+            else:
+                score //= 2
+        return score >> max(periods - len(self.window), 0)
+    
+    def update_user(self, user_id: str):
+        self.order.setdefault(user_id, len(self.order))
+        for category in FIELDS:
+            new_score = self.project(user_id, category)
+            old_score = self.projected[category].get(user_id)
+            if old_score == new_score:
+                continue
+            
+            ranks = self.ranks[category]
+            if old_score is not None:
+                del ranks[bisect_left(ranks, (-old_score, self.order[user_id], user_id))]
+            insort(ranks, (-new_score, self.order[user_id], user_id))
+            self.projected[category][user_id] = new_score
+            
+    def score(self, user_id: str, category: str) -> int:
+        return self.projected[category].get(user_id, 0)
+    
+    # Everyone above zero sorts ahead of everyone at zero, so this is where they end.
+    def ranked_count(self, category: str) -> int:
+        return bisect_left(self.ranks[category], (0,))
+    
+    # (user_id, score) pairs from start up to stop, best first.
+    # Users at zero are left out, so a page only costs as much as its own length.
+    def ranking(self, category: str, start: int = 0, stop: int = None) -> list:
+        end = self.ranked_count(category)
+        stop = end if stop is None else min(stop, end)
+        return [(user_id, -negative_score) for negative_score, _, user_id in self.ranks[category][start:stop]]
+    
+    # A user's place counting from 1, or None if they're at zero.
+    def rank(self, user_id: str, category: str):
+        score = self.score(user_id, category)
+        if score <= 0:
+            return None
+        return bisect_left(self.ranks[category], (-score, self.order[user_id], user_id)) + 1
+
+
+# Scores days into data the way their rollovers would have, for days
+# a shorter window pushed out before a rollover got to them.
+def score_days(data: dict, slots: list):
+    window = Day_Window(len(slots))
+    window.load([slot.to_json() for slot in slots])
+    engine = Score_Engine()
+    engine.rebuild(data, window)
+    users = set(data)
+    for slot in slots:
+        for members in slot.members.values():
+            users |= members
+    scores = {
+        user_id: {field: engine.roll_over(user_id, category, len(slots)) for category, field in FIELDS.items()}
+        for user_id in users
+    }
+    for user_id, score in scores.items():
+        data.setdefault(user_id, {}).update(score)
+
+
+# Checks that changing the window size leaves every projected score where it was.
+if __name__ == "__main__":
+    import copy
+    import datetime
+    import random
+    from utils.day_window import LEGACY_DAY_OFFSETS, window_from_legacy
+    
+    def dates(newest: str, count: int) -> list:
+        newest = datetime.date.fromisoformat(newest)
+        return [(newest - datetime.timedelta(days=days)).isoformat() for days in range(count - 1, -1, -1)]
+    
+    def projected(data: dict, window) -> dict:
+        engine = Score_Engine()
+        engine.rebuild(data, window)
+        return {category: dict(engine.projected[category]) for category in FIELDS}
+    
+    def resize(data: dict, window, size: int):
+        data = copy.deepcopy(data)
+        resized = Day_Window(size)
+        dropped = resized.load([slot.to_json() for slot in window])
+        resized.fill(window.today.date)
+        if dropped:
+            score_days(data, dropped)
+        return data, resized
+    
+    def roll(data: dict, window, date: str, members: dict):
+        engine = Score_Engine()
+        engine.rebuild(data, window)
+        data = {user_id: {field: engine.roll_over(user_id, category, 1) for category, field in FIELDS.items()} for user_id in data}
+        window.advance(date, 1, None)
+        window.today.members = members
+        return data
+    
+    random.seed(0)
+    users = [str(user_id) for user_id in range(30)]
+    # The reviewer's case, someone who read every day with 40 stored.
+    data = {"0": {"read": 40, "write": 0}}
+    window = Day_Window(3)
+    for date in dates("2026-10-18", 3):
+        window.append(date, readers=["0"])
+    data.update({user_id: {"read": random.randint(0, 50), "write": random.randint(0, 50)} for user_id in users[1:]})
+    for slot in window:
+        for user_id in users[1:]:
+            for category in FIELDS:
+                if random.random() < 0.5:
+                    slot.members[category].add(user_id)
+                    
+    expected = projected(data, window)
+    print(f"window 3, reads every day with 40 stored: {expected['readers']['0']}")
+    ok = True
+    for sizes in ((3, 7), (3, 7, 3), (3, 2), (3, 1, 7)):
+        resized_data, resized = data, window
+        for size in sizes[1:]:
+            resized_data, resized = resize(resized_data, resized, size)
+        scores = projected(resized_data, resized)
+        same = scores == expected
+        # And the rollovers after it have to agree too.
+        before_data, before = copy.deepcopy(data), resize(data, window, 3)[1]
+        for date in dates("2026-10-28", 10):
+            members = {category: {user_id for user_id in users if random.random() < 0.5} for category in FIELDS}
+            before_data = roll(before_data, before, date, {category: set(m) for category, m in members.items()})
+            resized_data = roll(resized_data, resized, date, {category: set(m) for category, m in members.items()})
+            same = same and projected(before_data, before) == projected(resized_data, resized)
+        ok = ok and same
+        print(f"{' -> '.join(map(str, sizes))}: scores unchanged {same}")
+        
+    # The old three fixed buckets into windows of other sizes.
+    meta = {"last_updated_date": "2026-10-18", "tracker_message_ids": [1, 2, 3]}
+    for day in LEGACY_DAY_OFFSETS:
+        meta[day + "readers"] = ["0"] + random.sample(users[1:], 10)
+        meta[day + "writers"] = random.sample(users[1:], 10)
+    legacy, _ = window_from_legacy(copy.deepcopy(meta), 3, "2026-10-18")
+    expected = projected(data, legacy)
+    for size in (1, 2, 7):
+        legacy_data = copy.deepcopy(data)
+        resized, dropped = window_from_legacy(copy.deepcopy(meta), size, "2026-10-18")
+        if dropped:
+            score_days(legacy_data, dropped)
+        same = projected(legacy_data, resized) == expected
+        ok = ok and same
+        print(f"legacy -> {size}: scores unchanged {same}")
+    print("all good" if ok else "SCORES CHANGED")
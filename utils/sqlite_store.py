@@ -0,0 +1,127 @@
+import asyncio
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from utils.day_window import CATEGORIES, meta_days
+
+# One row per user per day per category, so history grows by one row per reaction
+# instead of one full copy of meta per day like new_meta_log.json.
+# The primary key doubles as the per-user index.
+# Scores are only mirrored here as a backup, the leaderboard and /rank
+# read the in-memory Score_Engine since it has today's projected scores.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reactions (
+    user_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    category TEXT NOT NULL,
+    PRIMARY KEY (user_id, category, date)
+);
+CREATE INDEX IF NOT EXISTS reactions_by_date ON reactions (date, category);
+CREATE TABLE IF NOT EXISTS scores (
+    user_id TEXT PRIMARY KEY,
+    read INTEGER NOT NULL DEFAULT 0,
+    write INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+# Every query runs on the same single worker thread,
+# which keeps them in order and keeps sqlite off the event loop.
+class Sqlite_Store:
+    def __init__(self, path: str):
+        self.path = path
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tracker-sqlite")
+        self.conn = None
+        
+    def submit(self, fn, *args):
+        return asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+    
+    # For writes nobody waits on, errors still get printed.
+    def defer(self, fn, *args):
+        future = self.submit(fn, *args)
+        future.add_done_callback(self.report_error)
+        
+    def report_error(self, future):
+        if not future.cancelled() and future.exception():
+            print(f"Tracker database error: {future.exception()}")
+    
+    async def open(self):
+        await self.submit(self.connect)
+        
+    async def close(self):
+        await self.submit(self.disconnect)
+        self.executor.shutdown(wait=True)
+        
+    def connect(self):
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+        
+    def disconnect(self):
+        if self.conn:
+            self.conn.close()
+            self.conn = None
+            
+    def is_empty(self) -> bool:
+        row = self.conn.execute(
+            "SELECT (SELECT COUNT(*) FROM reactions) + (SELECT COUNT(*) FROM scores)"
+        ).fetchone()
+        return row[0] == 0
+            
+    def set_reaction(self, user_id: str, date: str, category: str, added: bool):
+        if added:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO reactions (user_id, date, category) VALUES (?, ?, ?)",
+                (user_id, date, category),
+            )
+        else:
+            self.conn.execute(
+                "DELETE FROM reactions WHERE user_id = ? AND date = ? AND category = ?",
+                (user_id, date, category),
+            )
+        self.conn.commit()
+        
+    # date -> (readers, writers), oldest first.
+    def history(self, since: str = "", until: str = "9999-12-31") -> dict:
+        rows = self.conn.execute(
+            "SELECT date, category, user_id FROM reactions WHERE date >= ? AND date <= ? ORDER BY date",
+            (since, until),
+        )
+        history = {}
+        for date, category, user_id in rows:
+            readers, writers = history.setdefault(date, (set(), set()))
+            (readers if category == "readers" else writers).add(user_id)
+        return history
+            
+    def save_scores(self, data: dict):
+        self.conn.executemany(
+            "INSERT INTO scores (user_id, read, write) VALUES (?, ?, ?) "
+            "ON CONFLICT(user_id) DO UPDATE SET read = excluded.read, write = excluded.write",
+            [(user_id, stats["read"], stats["write"]) for user_id, stats in data.items()],
+        )
+        self.conn.commit()
+        
+    # Replaces whatever is stored for each day bucket in meta with its contents.
+    def import_meta(self, meta: dict):
+        for date, readers, writers in meta_days(meta):
+            for category, users in zip(CATEGORIES, (readers, writers)):
+                self.conn.execute(
+                    "DELETE FROM reactions WHERE date = ? AND category = ?", (date, category)
+                )
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO reactions (user_id, date, category) VALUES (?, ?, ?)",
+                    [(str(user_id), date, category) for user_id in users],
+                )
+                
+    # Snapshots are applied oldest first, so later retroactive
+    # reactions and removals win over what an earlier snapshot saw.
+    def migrate_from_json(self, data: dict, meta: dict, log: dict):
+        snapshots = sorted(
+            (snapshot for snapshot in log.values() if snapshot.get("last_updated_date")),
+            key=lambda snapshot: snapshot["last_updated_date"],
+        )
+        for snapshot in snapshots + [meta]:
+            self.import_meta(snapshot)
+        self.save_scores(data)
+        self.conn.commit()
+        print(f"Migrated {len(snapshots)} logged days and current meta into {self.path}")
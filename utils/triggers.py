@@ -0,0 +1,98 @@
+import json, os
+import re
+import time
+
+# Each trigger in the config file has:
+#   name, keywords, responses ("{emoji}" gets swapped for the trigger's emoji),
+#   and optionally emoji, cooldown (seconds per channel),
+#   channels (only fire there) and disabled_channels (never fire there).
+def load_triggers(path: str) -> list:
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)["triggers"]
+
+# Compiles every keyword into one regex so a message gets scanned once,
+# no matter how many triggers there are.
+class Trigger_Engine:
+    def __init__(self, triggers: list):
+        self.triggers = triggers
+        self.keyword_owner = {}
+        for index, trigger in enumerate(triggers):
+            for keyword in trigger["keywords"]:
+                owner = self.keyword_owner.setdefault(keyword.lower(), index)
+                # One match can only point at one trigger, so the first one listed keeps it.
+                if owner != index:
+                    print(f"Trigger {trigger['name']}: keyword {keyword!r} already belongs to "
+                          f"{triggers[owner]['name']}, ignoring it here.")
+                
+        # Longest first, so a keyword that contains another one wins.
+        keywords = sorted(self.keyword_owner, key=len, reverse=True)
+        self.pattern = re.compile("|".join(re.escape(keyword) for keyword in keywords)) if keywords else None
+        # (trigger index, channel id) -> last time it fired
+        self.last_fired = {}
+        
+    # Triggers the text hits, in the same order as the config file.
+    def match(self, text: str) -> list:
+        if not self.pattern:
+            return []
+        hits = {self.keyword_owner[found.group()] for found in self.pattern.finditer(text.lower())}
+        return sorted(hits)
+    
+    def enabled_in(self, index: int, channel_id: int) -> bool:
+        trigger = self.triggers[index]
+        if "channels" in trigger and channel_id not in trigger["channels"]:
+            return False
+        return channel_id not in trigger.get("disabled_channels", [])
+    
+    def ready(self, index: int, channel_id: int, now: float = None) -> bool:
+        now = time.monotonic() if now is None else now
+        cooldown = self.triggers[index].get("cooldown", 0)
+        last = self.last_fired.get((index, channel_id))
+        return last is None or now - last >= cooldown
+    
+    # Starts the cooldown, only once a reply actually got queued.
+    def mark_fired(self, index: int, channel_id: int, now: float = None):
+        self.last_fired[(index, channel_id)] = time.monotonic() if now is None else now
+    
+    # (index, trigger) pairs that are allowed to fire. Nothing goes into cooldown
+    # here, the caller calls mark_fired for the ones it really replies to.
+    def fire(self, text: str, channel_id: int) -> list:
+        return [
+            (index, self.triggers[index]) for index in self.match(text)
+            if self.enabled_in(index, channel_id) and self.ready(index, channel_id)
+        ]
+
+# Compares one pass of the engine against one `in` scan per trigger.
+# Run from the repo root with: python -m utils.triggers
+if __name__ == "__main__":
+    import random
+    
+    triggers = load_triggers("data/triggers.json")
+    engine = Trigger_Engine(triggers)
+    words = (
+        "i finally finished the draft tonight and honestly it was rough but the ending "
+        "works now so tomorrow i edit the middle section lol anyone else submitting to "
+        "that flash contest this week the deadline is friday"
+    ).split()
+    keywords = [keyword for trigger in triggers for keyword in trigger["keywords"]]
+    random.seed(0)
+    corpus = []
+    for _ in range(20000):
+        message = random.choices(words, k=random.randint(3, 40))
+        if random.random() < 0.05:
+            message.insert(random.randint(0, len(message)), random.choice(keywords).upper())
+        corpus.append(" ".join(message))
+        
+    start = time.perf_counter()
+    naive = [[i for i, trigger in enumerate(triggers) if any(k in text.lower() for k in trigger["keywords"])] for text in corpus]
+    naive_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    compiled = [engine.match(text) for text in corpus]
+    compiled_time = time.perf_counter() - start
+    
+    print(f"{len(corpus)} messages, {len(triggers)} triggers")
+    print(f"one scan per trigger: {naive_time / len(corpus) * 1e6:.2f}us per message")
+    print(f"compiled single pass: {compiled_time / len(corpus) * 1e6:.2f}us per message")
+    print(f"same matches: {naive == compiled}")